@@ -1,34 +1,133 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from pydantic import BaseModel
 from dotenv import load_dotenv
 import os
-import base64
+import pybase64
 import asyncio
+import contextlib
+import functools
 import hashlib
-import json
 import uuid
+import logging
+import logging.handlers
+import queue
+import sys
+from typing import Any, Awaitable, Callable, Optional
 from concurrent.futures import ThreadPoolExecutor
-import google.genai as genai
-from services import audit_room, generate_renovation
+from dataclasses import dataclass
+from cachetools import LRUCache
+from cachetools.func import ttl_cache
+import orjson
+from redis.asyncio import Redis
+from services import (
+    audit_room,
+    audit_rooms,
+    generate_renovation,
+    gemini_client,
+    prefetch_image_bytes,
+    warmup_audit_cache,
+)
+from prompts import AUDIT_PROMPT_VERSION
 from scraper import scrape_realtor_ca_listing, get_property_images
 
 # Load environment variables from .env file
 load_dotenv()
 
-# Verify environment variables are loaded (for later use)
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+# Initialize FastAPI app (orjson serializes large payloads much faster)
+app = FastAPI(default_response_class=ORJSONResponse)
+
+# Buffered logging: handlers only enqueue records, a background thread writes them out
+log_queue: queue.Queue = queue.Queue(-1)
+logger = logging.getLogger("hearth")
+logger.setLevel(logging.INFO)
+logger.propagate = False
+logger.addHandler(logging.handlers.QueueHandler(log_queue))
+log_listener = logging.handlers.QueueListener(log_queue, logging.StreamHandler(sys.stdout))
+
+# Prefix for the JPEG data URLs returned to the frontend
+_JPEG_DATA_URL_PREFIX = "data:image/jpeg;base64,"
+
+# Thread pools for running synchronous code in async context:
+# - io_executor: blocking network calls (Gemini, scraper); threads mostly wait, so size generously
+# - cpu_executor: CPU-bound work (image encoding) so it can't queue behind slow network calls
+IO_POOL_SIZE = int(os.getenv("IO_POOL_SIZE", "32"))
+io_executor = ThreadPoolExecutor(max_workers=IO_POOL_SIZE, thread_name_prefix="io")
+cpu_executor = ThreadPoolExecutor(max_workers=os.cpu_count() or 1, thread_name_prefix="cpu")
+
+# Max concurrent Gemini calls (audits or generations) per listing job
+LISTING_IMAGE_CONCURRENCY = 6
+
+# Listing photos audited per Gemini request (the audit prompt is sent once per batch)
+AUDIT_BATCH_SIZE = 4
 
-# Initialize FastAPI app
-app = FastAPI()
+# Background jobs beyond MAX_CONCURRENT_JOBS wait for a slot; new submissions are
+# rejected with 429 once MAX_ACTIVE_JOBS are running or waiting
+MAX_CONCURRENT_JOBS = int(os.getenv("MAX_CONCURRENT_JOBS", "4"))
+MAX_ACTIVE_JOBS = int(os.getenv("MAX_ACTIVE_JOBS", "32"))
 
-# Thread pool for running synchronous code in async context
-executor = ThreadPoolExecutor(max_workers=3)
+# Slotted cache entry (much less per-entry overhead than a dict)
+@dataclass(slots=True)
+class CacheEntry:
+    jpeg_bytes: bytes
+    original_url: str
+
+# LRU cache split into shards, each with its own lock
+class ShardedCache:
+    """LRU cache split into independently locked shards to reduce lock contention."""
+
+    def __init__(self, maxsize: int, shards: int = 16, getsizeof: Optional[Callable] = None):
+        self._maps = [
+            LRUCache(maxsize=max(1, maxsize // shards), getsizeof=getsizeof)
+            for _ in range(shards)
+        ]
+        self._locks = [asyncio.Lock() for _ in range(shards)]
+
+    def _shard(self, key: str) -> int:
+        return hash(key) % len(self._maps)
+
+    async def get(self, key: str) -> Optional[CacheEntry]:
+        shard = self._shard(key)
+        async with self._locks[shard]:
+            return self._maps[shard].get(key)
+
+    async def set(self, key: str, value: CacheEntry) -> None:
+        shard = self._shard(key)
+        async with self._locks[shard]:
+            try:
+                self._maps[shard][key] = value
+            except ValueError:
+                # Larger than a whole shard - skip caching rather than fail the request
+                pass
 
-# In-memory cache for generated images
-# Key: hash of (image_url + image_gen_prompt + mask_prompt + two_pass params)
-# Value: { "renovated_image": base64_string, "original_url": str }
-image_generation_cache: dict[str, dict] = {}
+    def __len__(self) -> int:
+        return sum(len(m) for m in self._maps)
+
+# In-memory sharded LRU cache for generated images, bounded by total JPEG bytes
+# so RSS can't grow forever
+# Key: "{prompt_digest}:{url_digest}:{wheelchair_accessible}" (see get_cache_key)
+# Value: CacheEntry(jpeg_bytes=raw_image_bytes, original_url=str)
+# Raw bytes are ~25% smaller than the base64 data URL; encode on the way out
+IMAGE_CACHE_MAX_BYTES = 512 * 1024 * 1024
+IMAGE_CACHE_SHARDS = 16
+image_generation_cache = ShardedCache(
+    maxsize=IMAGE_CACHE_MAX_BYTES,
+    shards=IMAGE_CACHE_SHARDS,
+    getsizeof=lambda entry: len(entry.jpeg_bytes)
+)
+
+# Renovations currently being generated, keyed by cache key (single-flight)
+renovation_inflight: dict[str, asyncio.Future] = {}
+renovation_inflight_lock = asyncio.Lock()
+
+# In-memory LRU cache for audit results, so re-analyzing a listing skips Gemini
+# Key: "{wheelchair_accessible}:{image_url}"
+# Value: the audit dict returned by audit_room
+AUDIT_CACHE_MAX_ENTRIES = 1024
+audit_cache: LRUCache = LRUCache(maxsize=AUDIT_CACHE_MAX_ENTRIES)
+audit_cache_lock = asyncio.Lock()
+audit_inflight: dict[str, asyncio.Future] = {}
 
 # Global job tracking dictionary
 # Structure: {
@@ -45,31 +144,331 @@ image_generation_cache: dict[str, dict] = {}
 # }
 JOBS: dict[str, dict] = {}
 
-def get_cache_key(image_url: str, audit_data: dict, wheelchair_accessible: bool) -> str:
-    """Calculates a unique cache key for a renovation request."""
-    image_gen_prompt = audit_data.get("image_gen_prompt", "")
-    mask_prompt = audit_data.get("mask_prompt", "")
+# Per-job change counters, used by /job-status/{job_id}/stream to push updates
+# only when something actually changed
+job_versions: dict[str, int] = {}
+job_updated = asyncio.Condition()
+# Jobs owned by another worker are only visible through Redis, so re-check periodically
+JOB_STREAM_POLL_SECONDS = 1.0
+
+# Optional Redis backing store so job status and generated images are shared
+# across uvicorn workers (--workers N). Without REDIS_URL everything stays in-process.
+REDIS_URL = os.getenv("REDIS_URL")
+JOB_TTL_SECONDS = 24 * 60 * 60
+RENOVATION_TTL_SECONDS = 24 * 60 * 60
+redis_client: Optional[Redis] = Redis.from_url(REDIS_URL) if REDIS_URL else None
+
+# Progress updates are applied locally right away, but written to Redis at most
+# this often per job (changed fields are coalesced in between)
+JOB_FLUSH_INTERVAL_SECONDS = 0.25
+job_dirty_fields: dict[str, set[str]] = {}
+job_flushers: dict[str, asyncio.Task] = {}
+
+# Finished jobs are dropped from this worker's memory after an hour (Redis keeps
+# its own copy for JOB_TTL_SECONDS)
+FINISHED_JOB_TTL_SECONDS = 60 * 60
+
+async def create_job(job_id: str, job: dict) -> None:
+    """Registers a new job locally and, if configured, in Redis."""
+    JOBS[job_id] = job
+    if redis_client is not None:
+        key = f"job:{job_id}"
+        await redis_client.hset(key, mapping={k: orjson.dumps(v) for k, v in job.items()})
+        await redis_client.expire(key, JOB_TTL_SECONDS)
+
+async def update_job(job_id: str, **fields: Any) -> None:
+    """Updates fields of a job locally and, if configured, in Redis."""
+    JOBS[job_id].update(fields)
+    job_versions[job_id] = job_versions.get(job_id, 0) + 1
+    if fields.get("status") in ("completed", "failed"):
+        asyncio.get_running_loop().call_later(FINISHED_JOB_TTL_SECONDS, evict_job, job_id)
+    async with job_updated:
+        job_updated.notify_all()
+    if redis_client is not None:
+        job_dirty_fields.setdefault(job_id, set()).update(fields)
+        if job_id not in job_flushers:
+            job_flushers[job_id] = asyncio.create_task(flush_job(job_id))
+
+def evict_job(job_id: str) -> None:
+    """Removes a finished job from this worker's memory."""
+    JOBS.pop(job_id, None)
+    job_versions.pop(job_id, None)
+
+async def flush_job(job_id: str) -> None:
+    """Writes a job's changed fields to Redis every JOB_FLUSH_INTERVAL_SECONDS until it is clean."""
+    try:
+        while job_dirty_fields.get(job_id):
+            await asyncio.sleep(JOB_FLUSH_INTERVAL_SECONDS)
+            fields = job_dirty_fields.pop(job_id, set())
+            job = JOBS.get(job_id)
+            if job is None:
+                break
+            try:
+                await redis_client.hset(
+                    f"job:{job_id}", mapping={k: orjson.dumps(job[k]) for k in fields}
+                )
+            except Exception as e:
+                logger.error("Error writing job %s to Redis: %s", job_id, e)
+    finally:
+        job_flushers.pop(job_id, None)
+
+async def wait_for_job_update(job_id: str, seen_version: int, timeout: float) -> None:
+    """Waits until a job changes in this worker, or until the timeout expires."""
+    async with job_updated:
+        try:
+            await asyncio.wait_for(
+                job_updated.wait_for(lambda: job_versions.get(job_id, 0) != seen_version),
+                timeout
+            )
+        except asyncio.TimeoutError:
+            pass
+
+async def load_job(job_id: str) -> Optional[dict]:
+    """Returns a job from this worker's memory, falling back to Redis."""
+    job = JOBS.get(job_id)
+    if job is not None or redis_client is None:
+        return job
+    stored = await redis_client.hgetall(f"job:{job_id}")
+    if not stored:
+        return None
+    return {k.decode('utf-8'): orjson.loads(v) for k, v in stored.items()}
+
+async def get_cached_renovation(cache_key: str) -> Optional[CacheEntry]:
+    """Looks up a generated image locally, falling back to Redis."""
+    entry = await image_generation_cache.get(cache_key)
+    if entry is not None or redis_client is None:
+        return entry
+    stored = await redis_client.hmget(f"renovation:{cache_key}", "jpeg_bytes", "original_url")
+    if stored[0] is None:
+        return None
+    entry = CacheEntry(jpeg_bytes=stored[0], original_url=stored[1].decode('utf-8'))
+    await image_generation_cache.set(cache_key, entry)
+    return entry
+
+async def store_renovation(cache_key: str, entry: CacheEntry) -> None:
+    """Caches a generated image locally and, if configured, in Redis."""
+    await image_generation_cache.set(cache_key, entry)
+    if redis_client is not None:
+        key = f"renovation:{cache_key}"
+        await redis_client.hset(
+            key, mapping={"jpeg_bytes": entry.jpeg_bytes, "original_url": entry.original_url}
+        )
+        await redis_client.expire(key, RENOVATION_TTL_SECONDS)
+
+def extract_gen_kwargs(audit_data: dict) -> Optional[dict]:
+    """Builds the generate_renovation keyword arguments for an audit (None if it has no prompts)."""
+    image_gen_prompt = audit_data.get("image_gen_prompt")
+    mask_prompt = audit_data.get("mask_prompt")
+    if not image_gen_prompt or not mask_prompt:
+        return None
+    
+    # Check for two-pass workflow
     clear_mask = audit_data.get("clear_mask", "")
     clear_prompt = audit_data.get("clear_prompt", "")
     build_mask = audit_data.get("build_mask", "")
     build_prompt = audit_data.get("build_prompt", "")
     
     is_two_pass = bool(clear_mask and clear_prompt and build_mask and build_prompt)
-    
-    cache_key_data = {
-        "image_url": image_url,
-        "image_gen_prompt": image_gen_prompt,
+    return {
+        "prompt": image_gen_prompt,
         "mask_prompt": mask_prompt,
         "is_two_pass": is_two_pass,
-        "clear_mask": clear_mask if is_two_pass else "",
-        "clear_prompt": clear_prompt if is_two_pass else "",
-        "build_mask": build_mask if is_two_pass else "",
-        "build_prompt": build_prompt if is_two_pass else "",
-        "wheelchair_accessible": wheelchair_accessible,
+        "clear_mask": clear_mask if is_two_pass else None,
+        "clear_prompt": clear_prompt if is_two_pass else None,
+        "build_mask": build_mask if is_two_pass else None,
+        "build_prompt": build_prompt if is_two_pass else None,
     }
-    return hashlib.sha256(
-        json.dumps(cache_key_data, sort_keys=True).encode('utf-8')
-    ).hexdigest()
+
+def get_prompt_digest(audit_data: dict) -> str:
+    """Calculates a short digest of an audit's renovation prompts."""
+    image_gen_prompt = audit_data.get("image_gen_prompt", "")
+    mask_prompt = audit_data.get("mask_prompt", "")
+    clear_mask = audit_data.get("clear_mask", "")
+    clear_prompt = audit_data.get("clear_prompt", "")
+    build_mask = audit_data.get("build_mask", "")
+    build_prompt = audit_data.get("build_prompt", "")
+    
+    is_two_pass = bool(clear_mask and clear_prompt and build_mask and build_prompt)
+    if not is_two_pass:
+        clear_mask = clear_prompt = build_mask = build_prompt = ""
+    
+    # NUL-separated fields keep the concatenation unambiguous; one encode + one
+    # BLAKE2b pass over the joined string (128-bit digest is plenty for an in-memory key)
+    key_material = "\x00".join((
+        image_gen_prompt or "",
+        mask_prompt or "",
+        clear_mask or "",
+        clear_prompt or "",
+        build_mask or "",
+        build_prompt or "",
+        "1" if is_two_pass else "0",
+    ))
+    return hashlib.blake2b(key_material.encode('utf-8'), digest_size=16).hexdigest()
+
+def get_cache_key(
+    image_url: str,
+    audit_data: dict,
+    wheelchair_accessible: bool,
+    prompt_digest: Optional[str] = None
+) -> str:
+    """
+    Calculates a unique cache key for a renovation request.
+    prompt_digest may only be passed for audits this server produced (get_audit stores
+    one on them); audit_data sent by a client is always rehashed, since a digest it
+    carries could belong to different prompts.
+    """
+    prompt_digest = prompt_digest or get_prompt_digest(audit_data)
+    url_digest = hashlib.blake2b((image_url or "").encode('utf-8'), digest_size=8).hexdigest()
+    return f"{prompt_digest}:{url_digest}:{int(wheelchair_accessible)}"
+
+async def single_flight(
+    inflight: dict[str, asyncio.Future],
+    lock: asyncio.Lock,
+    key: str,
+    factory: Callable[[], Awaitable[dict]]
+) -> dict:
+    """
+    Runs factory() once per key. Concurrent callers with the same key await the
+    first caller's result instead of starting a duplicate Gemini call.
+    """
+    async with lock:
+        future = inflight.get(key)
+        is_owner = future is None
+        if is_owner:
+            future = asyncio.get_running_loop().create_future()
+            # Mark the exception as retrieved even when nobody else is waiting
+            future.add_done_callback(lambda f: f.cancelled() or f.exception())
+            inflight[key] = future
+
+    if not is_owner:
+        return await asyncio.shield(future)
+
+    try:
+        result = await factory()
+        future.set_result(result)
+        return result
+    except Exception as e:
+        future.set_exception(e)
+        raise
+    finally:
+        async with lock:
+            inflight.pop(key, None)
+        if not future.done():
+            future.cancel()
+
+def get_audit_cache_key(image_url: str, wheelchair_accessible: bool) -> str:
+    """Calculates the audit_cache key for an image."""
+    # Prompt version first, so results from an edited prompt are never reused
+    return f"{AUDIT_PROMPT_VERSION}:{wheelchair_accessible}:{image_url}"
+
+async def get_audit(
+    image_url: str,
+    wheelchair_accessible: bool,
+    slots: Optional[asyncio.Semaphore] = None
+) -> dict:
+    """
+    Audits an image, reusing cached results and any identical audit in flight.
+    If slots is given, it is only acquired when Gemini actually has to be called.
+    """
+    key = get_audit_cache_key(image_url, wheelchair_accessible)
+    async with audit_cache_lock:
+        audit_data = audit_cache.get(key)
+    if audit_data is not None:
+        return audit_data
+
+    async def run_audit() -> dict:
+        # Run audit in executor (synchronous function); failures are not cached
+        loop = asyncio.get_running_loop()
+        async with slots or contextlib.nullcontext():
+            audit_data = await loop.run_in_executor(
+                io_executor,
+                audit_room,
+                image_url,
+                wheelchair_accessible
+            )
+        # Computed once here; the frontend sends it back with /generate-renovation
+        audit_data["prompt_digest"] = get_prompt_digest(audit_data)
+        async with audit_cache_lock:
+            audit_cache[key] = audit_data
+        return audit_data
+
+    return await single_flight(audit_inflight, audit_cache_lock, key, run_audit)
+
+async def get_audits(
+    image_urls: list[str],
+    wheelchair_accessible: bool,
+    slots: Optional[asyncio.Semaphore] = None
+) -> list:
+    """
+    Audits several images, sending the uncached ones to Gemini in one batched request.
+    Returns one audit (or the exception it failed with) per URL. If the batched
+    request fails, the images are audited one by one through get_audit instead.
+    """
+    keys = [get_audit_cache_key(image_url, wheelchair_accessible) for image_url in image_urls]
+    async with audit_cache_lock:
+        audits = [audit_cache.get(key) for key in keys]
+    missing = [idx for idx, audit_data in enumerate(audits) if audit_data is None]
+
+    if len(missing) > 1:
+        try:
+            loop = asyncio.get_running_loop()
+            async with slots or contextlib.nullcontext():
+                batch = await loop.run_in_executor(
+                    io_executor,
+                    audit_rooms,
+                    [image_urls[idx] for idx in missing],
+                    wheelchair_accessible
+                )
+            async with audit_cache_lock:
+                for idx, audit_data in zip(missing, batch):
+                    audit_data["prompt_digest"] = get_prompt_digest(audit_data)
+                    audit_cache[keys[idx]] = audit_data
+                    audits[idx] = audit_data
+            missing = []
+        except Exception as e:
+            logger.warning("Batched audit failed, auditing images individually: %s", e)
+
+    if missing:
+        retried = await asyncio.gather(
+            *(get_audit(image_urls[idx], wheelchair_accessible, slots) for idx in missing),
+            return_exceptions=True
+        )
+        for idx, audit_data in zip(missing, retried):
+            audits[idx] = audit_data
+    return audits
+
+# Tracked background job tasks (also keeps them from being garbage collected)
+active_jobs: set[asyncio.Task] = set()
+job_slots = asyncio.Semaphore(MAX_CONCURRENT_JOBS)
+
+async def run_job_in_slot(worker: Awaitable[None]) -> None:
+    """Runs a background job worker once one of the MAX_CONCURRENT_JOBS slots is free."""
+    async with job_slots:
+        await worker
+
+def on_job_done(task: asyncio.Task) -> None:
+    """Untracks a finished job task and logs anything that escaped the worker."""
+    active_jobs.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("Background job crashed: %s", task.exception())
+
+def start_job(worker: Awaitable[None]) -> None:
+    """Schedules a background job worker and tracks it in active_jobs."""
+    task = asyncio.create_task(run_job_in_slot(worker))
+    active_jobs.add(task)
+    task.add_done_callback(on_job_done)
+
+def too_many_jobs_response() -> Optional[ORJSONResponse]:
+    """Returns a 429 response if no more background jobs can be accepted."""
+    if len(active_jobs) < MAX_ACTIVE_JOBS:
+        return None
+    return ORJSONResponse(
+        status_code=429,
+        content={
+            "error": "Too many jobs in progress, please try again shortly",
+            "job_id": None
+        }
+    )
  
 # Add CORS middleware to allow frontend origin
 app.add_middleware(
@@ -97,7 +496,7 @@ class TestRenovationRequest(BaseModel):
 
 class GenerateRenovationRequest(BaseModel):
     image_url: str
-    audit_data: dict  # Pass the full audit result from the listing analysis
+    audit_data: dict[str, Any]  # Pass the full audit result from the listing analysis
     wheelchair_accessible: bool = False
 
 # Background worker function for processing listing jobs
@@ -115,19 +514,22 @@ async def process_listing_job(
     4. Updates JOBS[job_id] with progress throughout
     """
     try:
-        loop = asyncio.get_event_loop()
+        loop = asyncio.get_running_loop()
         
         # Phase 1: Scraping & Setup
-        JOBS[job_id]["current_status"] = "Scraping listing..."
+        await update_job(job_id, current_status="Scraping listing...")
         listing_data = await loop.run_in_executor(
-            executor,
+            io_executor,
             scrape_realtor_ca_listing,
             listing_url
         )
         
         if "error" in listing_data:
-            JOBS[job_id]["status"] = "failed"
-            JOBS[job_id]["error"] = f"Failed to scrape listing: {listing_data['error']}"
+            await update_job(
+                job_id,
+                status="failed",
+                error=f"Failed to scrape listing: {listing_data['error']}"
+            )
             return
         
         # Store property info
@@ -142,133 +544,170 @@ async def process_listing_job(
             "location": listing_data.get("neighborhood", {}).get("location_description", ""),
             "amenities": listing_data.get("neighborhood", {}).get("amenities", []),
         }
-        JOBS[job_id]["property_info"] = property_info
+        await update_job(job_id, property_info=property_info)
         
         # Get image URLs
         image_urls = listing_data.get("property_photos", [])
         if not image_urls:
-            JOBS[job_id]["status"] = "failed"
-            JOBS[job_id]["error"] = "No images found in listing"
+            await update_job(
+                job_id,
+                status="failed",
+                error="No images found in listing"
+            )
             return
         
         images_to_analyze = image_urls[:max_images]
         total_images = len(images_to_analyze)
-        JOBS[job_id]["total_images"] = total_images
-        JOBS[job_id]["results"] = []
+        # Published once by reference: audit results are appended as batches finish and
+        # generation results are filled into these dicts in place, so progress updates
+        # below only carry progress fields
+        audit_results: list[dict] = []
+        await update_job(
+            job_id,
+            total_images=total_images,
+            results=audit_results
+        )
         
-        # Phase 2: Audit Loop
-        audit_results = []
-        for idx, image_url in enumerate(images_to_analyze, 1):
-            try:
-                JOBS[job_id]["current_status"] = f"Auditing image {idx}/{total_images}"
-                
-                # Run audit in executor (synchronous function)
-                audit_data = await loop.run_in_executor(
-                    executor,
-                    audit_room,
-                    image_url,
-                    wheelchair_accessible
-                )
-                
-                audit_results.append({
-                    "image_number": idx,
-                    "original_url": image_url,
-                    "audit": audit_data
-                })
-                
-                # Update audit progress
-                JOBS[job_id]["audit_progress"] = int((idx / total_images) * 100)
-                JOBS[job_id]["results"] = audit_results.copy()
-                
-            except Exception as e:
-                print(f"Error auditing image {idx}: {str(e)}")
-                audit_results.append({
-                    "image_number": idx,
-                    "original_url": image_url,
-                    "error": str(e),
-                    "audit": None
-                })
-                # Continue with next image
-        
-        # Phase 3: Generation Loop
-        for idx, result in enumerate(audit_results, 1):
+        # Start downloading the photos that still need an audit now, so batches waiting
+        # for a Gemini slot find their bytes already cached
+        async with audit_cache_lock:
+            unaudited = [
+                image_url for image_url in images_to_analyze
+                if get_audit_cache_key(image_url, wheelchair_accessible) not in audit_cache
+            ]
+        prefetch_image_bytes(unaudited)
+        
+        # Bound how many of this listing's Gemini calls run at once (quota protection)
+        gemini_slots = asyncio.Semaphore(LISTING_IMAGE_CONCURRENCY)
+        
+        # Phase 2: Audit all images in concurrent batches of AUDIT_BATCH_SIZE (one Gemini call each).
+        # Phase 3 is fused into it: each image's generation starts as soon as its batch is audited.
+        await update_job(job_id, current_status=f"Auditing {total_images} images...")
+        audits_done = 0
+        generations_done = 0
+        generation_tasks: list[asyncio.Task] = []
+        
+        async def run_generation(idx: int, result: dict, gen_kwargs: Optional[dict]) -> None:
+            nonlocal generations_done
             try:
-                if not result.get("audit"):
-                    # Skip if audit failed
-                    continue
+                if not gen_kwargs:
+                    # Skip if the audit failed or produced no prompts
+                    return
                 
                 audit_data = result["audit"]
                 image_url = result["original_url"]
+                # Our own audit, so its precomputed digest can be trusted
+                cache_key = get_cache_key(
+                    image_url, audit_data, wheelchair_accessible, audit_data["prompt_digest"]
+                )
                 
-                JOBS[job_id]["current_status"] = f"Generating image {idx}/{total_images}"
-                
-                # Extract prompts
-                image_gen_prompt = audit_data.get("image_gen_prompt")
-                mask_prompt = audit_data.get("mask_prompt")
-                
-                if not image_gen_prompt or not mask_prompt:
-                    # No prompts available, skip generation
-                    continue
-                
-                # Check for two-pass workflow
-                clear_mask = audit_data.get("clear_mask", "")
-                clear_prompt = audit_data.get("clear_prompt", "")
-                build_mask = audit_data.get("build_mask", "")
-                build_prompt = audit_data.get("build_prompt", "")
-                
-                is_two_pass = bool(clear_mask and clear_prompt and build_mask and build_prompt)
+                if await get_cached_renovation(cache_key) is not None:
+                    # Already generated (e.g. by an earlier run of this listing), skip Gemini
+                    result["cache_key"] = cache_key
+                    result["image_endpoint"] = f"/renovation-image/{cache_key}"
+                    return
                 
                 # Generate renovation in executor (synchronous function)
-                renovated_image_bytes = await loop.run_in_executor(
-                    executor,
-                    lambda: generate_renovation(
-                        image_url,
-                        image_gen_prompt,
-                        mask_prompt,
-                        is_two_pass=is_two_pass,
-                        clear_mask=clear_mask if is_two_pass else None,
-                        clear_prompt=clear_prompt if is_two_pass else None,
-                        build_mask=build_mask if is_two_pass else None,
-                        build_prompt=build_prompt if is_two_pass else None,
-                        wheelchair_accessible=wheelchair_accessible
+                async with gemini_slots:
+                    renovated_image_bytes = await loop.run_in_executor(
+                        io_executor,
+                        functools.partial(
+                            generate_renovation,
+                            image_url,
+                            **gen_kwargs,
+                            wheelchair_accessible=wheelchair_accessible
+                        )
                     )
-                )
                 
                 if renovated_image_bytes:
-                    # Encode to base64
-                    base64_encoded = base64.b64encode(renovated_image_bytes).decode('utf-8')
-                    renovated_image_base64 = f"data:image/jpeg;base64,{base64_encoded}"
-                    result["renovated_image"] = renovated_image_base64
-                    
-                    # NEW: Populate the generation cache so follow-up requests are HITs
+                    # Populate the generation cache so follow-up requests are HITs.
+                    # Only the raw JPEG is kept; it is served from /renovation-image/{cache_key}
+                    # instead of being base64-encoded into every job-status poll.
                     try:
-                        cache_key = get_cache_key(image_url, audit_data, wheelchair_accessible)
-                        image_generation_cache[cache_key] = {
-                            "renovated_image": renovated_image_base64,
-                            "original_url": image_url
-                        }
-                        print(f"Populated cache for: {image_url[:50]}... (key: {cache_key[:8]})")
+                        await store_renovation(cache_key, CacheEntry(
+                            jpeg_bytes=renovated_image_bytes,
+                            original_url=image_url
+                        ))
+                        result["cache_key"] = cache_key
+                        result["image_endpoint"] = f"/renovation-image/{cache_key}"
+                        logger.debug("Populated cache for: %s... (key: %s)", image_url[:50], cache_key[:8])
                     except Exception as cache_err:
-                        print(f"Error populating cache: {str(cache_err)}")
-                
-                # Update generation progress
-                JOBS[job_id]["generation_progress"] = int((idx / total_images) * 100)
-                JOBS[job_id]["results"] = audit_results.copy()
+                        logger.error("Error populating cache: %s", cache_err)
                 
             except Exception as e:
-                print(f"Error generating renovation for image {idx}: {str(e)}")
-                # Continue with next image
+                logger.error("Error generating renovation for image %d: %s", idx, e)
+                # Continue with other images
+            finally:
+                # Update generation progress as each image finishes
+                generations_done += 1
+                await update_job(
+                    job_id,
+                    current_status=f"Generated image {generations_done}/{total_images}",
+                    generation_progress=int((generations_done / total_images) * 100)
+                )
+        
+        async def run_audit_batch(start: int, batch_urls: list[str]) -> None:
+            nonlocal audits_done
+            try:
+                # Cached audits (e.g. a re-analyzed listing) return without taking a slot
+                audits = await get_audits(batch_urls, wheelchair_accessible, gemini_slots)
+                for idx, (image_url, audit_data) in enumerate(zip(batch_urls, audits), start + 1):
+                    if isinstance(audit_data, Exception):
+                        logger.error("Error auditing image %d: %s", idx, audit_data)
+                        result = {
+                            "image_number": idx,
+                            "original_url": image_url,
+                            "error": str(audit_data),
+                            "audit": None
+                        }
+                        gen_kwargs = None
+                    else:
+                        result = {
+                            "image_number": idx,
+                            "original_url": image_url,
+                            "audit": audit_data
+                        }
+                        gen_kwargs = extract_gen_kwargs(audit_data)
+                    audit_results.append(result)
+                    # Kick off generation now instead of waiting for the remaining batches
+                    generation_tasks.append(asyncio.create_task(run_generation(idx, result, gen_kwargs)))
+            finally:
+                # Update audit progress as each batch finishes
+                audits_done += len(batch_urls)
+                await update_job(
+                    job_id,
+                    current_status=f"Audited image {audits_done}/{total_images}",
+                    audit_progress=int((audits_done / total_images) * 100)
+                )
         
-        # Phase 4: Completion
-        JOBS[job_id]["status"] = "completed"
-        JOBS[job_id]["current_status"] = "Completed"
-        JOBS[job_id]["audit_progress"] = 100
-        JOBS[job_id]["generation_progress"] = 100
+        try:
+            await asyncio.gather(*(
+                run_audit_batch(start, images_to_analyze[start:start + AUDIT_BATCH_SIZE])
+                for start in range(0, total_images, AUDIT_BATCH_SIZE)
+            ))
+        finally:
+            # Generations already scheduled are awaited even if an audit batch crashed
+            await asyncio.gather(*generation_tasks, return_exceptions=True)
+        
+        # Phase 4: Completion. Batches may finish out of order, so restore image order
+        # (in place) and hand the finished list to the Redis flush once
+        audit_results.sort(key=lambda result: result["image_number"])
+        await update_job(
+            job_id,
+            status="completed",
+            current_status="Completed",
+            audit_progress=100,
+            generation_progress=100,
+            results=audit_results
+        )
         
     except Exception as e:
-        print(f"Error in process_listing_job: {str(e)}")
-        JOBS[job_id]["status"] = "failed"
-        JOBS[job_id]["error"] = f"Job failed: {str(e)}"
+        logger.error("Error in process_listing_job: %s", e)
+        await update_job(
+            job_id,
+            status="failed",
+            error=f"Job failed: {str(e)}"
+        )
 
 
 # Background worker function for processing single image jobs
@@ -284,20 +723,18 @@ async def process_single_image_job(
     3. Updates JOBS[job_id] with progress
     """
     try:
-        loop = asyncio.get_event_loop()
+        loop = asyncio.get_running_loop()
         
         # Initialize job structure
-        JOBS[job_id]["total_images"] = 1
-        JOBS[job_id]["results"] = []
+        await update_job(
+            job_id,
+            total_images=1,
+            results=[]
+        )
         
         # Phase 1: Audit
-        JOBS[job_id]["current_status"] = "Auditing image 1/1"
-        audit_data = await loop.run_in_executor(
-            executor,
-            audit_room,
-            image_url,
-            wheelchair_accessible
-        )
+        await update_job(job_id, current_status="Auditing image 1/1")
+        audit_data = await get_audit(image_url, wheelchair_accessible)
         
         result = {
             "image_number": 1,
@@ -305,78 +742,136 @@ async def process_single_image_job(
             "audit": audit_data
         }
         
-        JOBS[job_id]["audit_progress"] = 100
-        JOBS[job_id]["results"].append(result)
+        await update_job(job_id, audit_progress=100, results=[result])
         
         # Phase 2: Generation
-        JOBS[job_id]["current_status"] = "Generating image 1/1"
+        await update_job(job_id, current_status="Generating image 1/1")
         
-        image_gen_prompt = audit_data.get("image_gen_prompt")
-        mask_prompt = audit_data.get("mask_prompt")
+        gen_kwargs = extract_gen_kwargs(audit_data)
         
-        if image_gen_prompt and mask_prompt:
-            # Check for two-pass workflow
-            clear_mask = audit_data.get("clear_mask", "")
-            clear_prompt = audit_data.get("clear_prompt", "")
-            build_mask = audit_data.get("build_mask", "")
-            build_prompt = audit_data.get("build_prompt", "")
-            
-            is_two_pass = bool(clear_mask and clear_prompt and build_mask and build_prompt)
-            
+        if gen_kwargs:
             renovated_image_bytes = await loop.run_in_executor(
-                executor,
-                lambda: generate_renovation(
+                io_executor,
+                functools.partial(
+                    generate_renovation,
                     image_url,
-                    image_gen_prompt,
-                    mask_prompt,
-                    is_two_pass=is_two_pass,
-                    clear_mask=clear_mask if is_two_pass else None,
-                    clear_prompt=clear_prompt if is_two_pass else None,
-                    build_mask=build_mask if is_two_pass else None,
-                    build_prompt=build_prompt if is_two_pass else None,
+                    **gen_kwargs,
                     wheelchair_accessible=wheelchair_accessible
                 )
             )
             
             if renovated_image_bytes:
-                base64_encoded = base64.b64encode(renovated_image_bytes).decode('utf-8')
-                renovated_image_base64 = f"data:image/jpeg;base64,{base64_encoded}"
-                result["renovated_image"] = renovated_image_base64
-                
                 # Populate the generation cache so follow-up requests are HITs
+                # (raw JPEG only, served from /renovation-image/{cache_key})
                 try:
-                    cache_key = get_cache_key(image_url, audit_data, wheelchair_accessible)
-                    image_generation_cache[cache_key] = {
-                        "renovated_image": renovated_image_base64,
-                        "original_url": image_url
-                    }
-                    print(f"Populated cache for single image: {image_url[:50]}... (key: {cache_key[:8]})")
+                    cache_key = get_cache_key(
+                        image_url, audit_data, wheelchair_accessible, audit_data["prompt_digest"]
+                    )
+                    await store_renovation(cache_key, CacheEntry(
+                        jpeg_bytes=renovated_image_bytes,
+                        original_url=image_url
+                    ))
+                    result["cache_key"] = cache_key
+                    result["image_endpoint"] = f"/renovation-image/{cache_key}"
+                    logger.debug("Populated cache for single image: %s... (key: %s)", image_url[:50], cache_key[:8])
                 except Exception as cache_err:
-                    print(f"Error populating cache: {str(cache_err)}")
+                    logger.error("Error populating cache: %s", cache_err)
         
         # Add to results list again to ensure it has the image
-        JOBS[job_id]["results"] = [result]
+        await update_job(job_id, results=[result])
         
         # Completion
-        JOBS[job_id]["status"] = "completed"
-        JOBS[job_id]["current_status"] = "Completed"
-        JOBS[job_id]["generation_progress"] = 100
-        JOBS[job_id]["property_info"] = {
-            "address": "Single Image Analysis",
-            "price": "N/A",
-            "bedrooms": "N/A",
-            "bathrooms": "N/A",
-            "square_feet": "N/A",
-            "mls_number": "N/A",
-            "neighborhood": "N/A",
-            "location": "",
-            "amenities": []
-        }
+        await update_job(
+            job_id,
+            status="completed",
+            current_status="Completed",
+            generation_progress=100,
+            property_info={
+                "address": "Single Image Analysis",
+                "price": "N/A",
+                "bedrooms": "N/A",
+                "bathrooms": "N/A",
+                "square_feet": "N/A",
+                "mls_number": "N/A",
+                "neighborhood": "N/A",
+                "location": "",
+                "amenities": []
+            }
+        )
         
     except Exception as e:
-        print(f"Error in process_single_image_job: {str(e)}")
-        JOBS[job_id]["status"] = "failed"
-        JOBS[job_id]["error"] = f"Job failed: {str(e)}"
+        logger.error("Error in process_single_image_job: %s", e)
+        await update_job(
+            job_id,
+            status="failed",
+            error=f"Job failed: {str(e)}"
+        )
+
+
+# Start/stop the background log writer with the app
+@app.on_event("startup")
+async def start_log_listener():
+    log_listener.start()
+
+# Make bare asyncio.to_thread()/run_in_executor(None, ...) calls use the sized I/O pool
+@app.on_event("startup")
+async def set_default_executor():
+    asyncio.get_running_loop().set_default_executor(io_executor)
+
+@app.on_event("shutdown")
+async def stop_log_listener():
+    log_listener.stop()
+
+# The model list rarely changes, so /models serves a snapshot refreshed hourly
+MODELS_CACHE_TTL_SECONDS = 60 * 60
+
+@ttl_cache(maxsize=1, ttl=MODELS_CACHE_TTL_SECONDS)
+def _fetch_models_snapshot() -> tuple[dict, ...]:
+    """Fetches and formats the available Gemini models (blocking)."""
+    return tuple(
+        {
+            "name": model.name,
+            "display_name": getattr(model, 'display_name', model.name),
+            "description": getattr(model, 'description', ''),
+        }
+        for model in gemini_client.models.list()
+    )
+
+def _warm_gemini_client() -> None:
+    """Forces DNS, TLS and connection-pool setup for the shared Gemini client."""
+    try:
+        # Also fills the /models snapshot
+        _fetch_models_snapshot()
+        logger.info("Gemini client warmed up")
+    except Exception as e:
+        logger.warning("Gemini client warm-up failed: %s", e)
+    _warm_audit_prompt_cache()
+
+# Optionally re-send the audit warm-up periodically so Gemini's prompt cache stays
+# hot between bursts of traffic (0 disables; each re-warm costs one small request)
+AUDIT_CACHE_REWARM_SECONDS = float(os.getenv("AUDIT_CACHE_REWARM_SECONDS", "0"))
+
+def _warm_audit_prompt_cache() -> None:
+    """Primes Gemini's implicit cache with the audit prompt prefix."""
+    try:
+        warmup_audit_cache()
+        logger.info("Audit prompt cache warmed up")
+    except Exception as e:
+        logger.warning("Audit prompt cache warm-up failed: %s", e)
+
+async def rewarm_audit_prompt_cache() -> None:
+    """Re-primes the audit prompt cache every AUDIT_CACHE_REWARM_SECONDS."""
+    loop = asyncio.get_running_loop()
+    while True:
+        await asyncio.sleep(AUDIT_CACHE_REWARM_SECONDS)
+        await loop.run_in_executor(io_executor, _warm_audit_prompt_cache)
+
+# Warm the Gemini client in the background so the first request skips the cold start
+@app.on_event("startup")
+async def warm_gemini_client():
+    asyncio.get_running_loop().run_in_executor(io_executor, _warm_gemini_client)
+    if AUDIT_CACHE_REWARM_SECONDS > 0:
+        app.state.audit_rewarm_task = asyncio.create_task(rewarm_audit_prompt_cache())
 
 
 # Health check endpoint
@@ -389,17 +884,10 @@ async def health():
 async def list_models():
     """List all available Gemini models for your API key."""
     try:
-        client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
-        models = client.models.list()
-        
-        # Filter and format model information
-        available_models = []
-        for model in models:
-            available_models.append({
-                "name": model.name,
-                "display_name": getattr(model, 'display_name', model.name),
-                "description": getattr(model, 'description', ''),
-            })
+        # Cached snapshot; a refresh is a blocking SDK call, so it runs in the executor
+        loop = asyncio.get_running_loop()
+        models = await loop.run_in_executor(io_executor, _fetch_models_snapshot)
+        available_models = list(models)
         
         return {
             "available_models": available_models,
@@ -426,12 +914,16 @@ async def analyze(request: AnalyzeRequest):
             "job_id": str  # Use this to poll /job-status/{job_id} for progress
         }
     """
+    rejected = too_many_jobs_response()
+    if rejected is not None:
+        return rejected
+
     try:
         # Generate unique job ID
         job_id = str(uuid.uuid4())
         
-        # Initialize job in JOBS dict
-        JOBS[job_id] = {
+        # Initialize job in the job store
+        await create_job(job_id, {
             "status": "processing",
             "property_info": None,
             "total_images": 1,
@@ -440,10 +932,10 @@ async def analyze(request: AnalyzeRequest):
             "current_status": "Initializing...",
             "results": [],
             "error": None
-        }
+        })
         
-        # Launch background task
-        asyncio.create_task(
+        # Launch background task (queued behind MAX_CONCURRENT_JOBS)
+        start_job(
             process_single_image_job(
                 job_id,
                 request.image_url,
@@ -465,8 +957,11 @@ async def analyze(request: AnalyzeRequest):
 async def test_renovation(request: TestRenovationRequest):
     """Test endpoint for generate_renovation function. Returns base64-encoded image."""
     try:
-        # Call generate_renovation with provided parameters
-        renovated_image_bytes = generate_renovation(
+        # Call generate_renovation in the executor so the event loop stays responsive
+        loop = asyncio.get_running_loop()
+        renovated_image_bytes = await loop.run_in_executor(
+            io_executor,
+            generate_renovation,
             request.image_url,
             request.image_gen_prompt,
             request.mask_prompt
@@ -474,10 +969,14 @@ async def test_renovation(request: TestRenovationRequest):
         
         if renovated_image_bytes:
             # Encode image to base64 (Gemini returns JPEG based on JFIF signature)
-            base64_encoded = base64.b64encode(renovated_image_bytes).decode('utf-8')
+            base64_encoded = await loop.run_in_executor(
+                cpu_executor,
+                pybase64.b64encode_as_string,
+                renovated_image_bytes
+            )
             return {
                 "success": True,
-                "image_base64": f"data:image/jpeg;base64,{base64_encoded}",
+                "image_base64": _JPEG_DATA_URL_PREFIX + base64_encoded,
                 "message": "Image generated successfully"
             }
         else:
@@ -510,12 +1009,16 @@ async def analyze_from_listing(request: ListingUrlRequest):
             "job_id": str  # Use this to poll /job-status/{job_id} for progress
         }
     """
+    rejected = too_many_jobs_response()
+    if rejected is not None:
+        return rejected
+
     try:
         # Generate unique job ID
         job_id = str(uuid.uuid4())
         
-        # Initialize job in JOBS dict
-        JOBS[job_id] = {
+        # Initialize job in the job store
+        await create_job(job_id, {
             "status": "processing",
             "property_info": None,
             "total_images": 0,
@@ -524,10 +1027,10 @@ async def analyze_from_listing(request: ListingUrlRequest):
             "current_status": "Initializing...",
             "results": [],
             "error": None
-        }
+        })
         
-        # Launch background task
-        asyncio.create_task(
+        # Launch background task (queued behind MAX_CONCURRENT_JOBS)
+        start_job(
             process_listing_job(
                 job_id,
                 request.listing_url,
@@ -564,13 +1067,13 @@ async def get_job_status(job_id: str):
             "error": str | None
         }
     """
-    if job_id not in JOBS:
+    job = await load_job(job_id)
+    if job is None:
         return {
             "error": "Job not found",
             "status_code": 404
         }
     
-    job = JOBS[job_id]
     return {
         "job_id": job_id,
         "status": job["status"],
@@ -579,17 +1082,58 @@ async def get_job_status(job_id: str):
         "current_status": job.get("current_status", ""),
         "total_images": job.get("total_images", 0),
         "property_info": job.get("property_info"),
-        "results": job.get("results", []),
+        "results": list(job.get("results", [])),  # Snapshot; the job may still be appending
         "error": job.get("error")
     }
 
+# Server-Sent Events stream of job progress (alternative to polling /job-status)
+@app.get("/job-status/{job_id}/stream")
+async def stream_job_status(job_id: str):
+    """
+    Stream job progress as Server-Sent Events.
+
+    Each event is a JSON object holding only the job fields that changed since the
+    previous event (the first event holds every field). The stream ends once the
+    job is completed or failed.
+    """
+    async def events():
+        sent: dict[str, bytes] = {}
+        while True:
+            seen_version = job_versions.get(job_id, 0)
+            job = await load_job(job_id)
+            if job is None:
+                yield b'data: ' + orjson.dumps({"error": "Job not found", "status_code": 404}) + b'\n\n'
+                return
+
+            changed = {}
+            for field, value in job.items():
+                encoded = orjson.dumps(value)
+                if sent.get(field) != encoded:
+                    sent[field] = encoded
+                    changed[field] = value
+            if changed:
+                changed["job_id"] = job_id
+                yield b'data: ' + orjson.dumps(changed) + b'\n\n'
+
+            if job.get("status") in ("completed", "failed"):
+                return
+            await wait_for_job_update(job_id, seen_version, JOB_STREAM_POLL_SECONDS)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"}
+    )
+
 # NEW: Generate renovation image on-demand when user clicks on a photo
 @app.post("/generate-renovation")
-async def generate_renovation_endpoint(request: GenerateRenovationRequest):
+async def generate_renovation_endpoint(request: GenerateRenovationRequest, http_request: Request):
     """
     Generate renovation image for a specific photo when user clicks on it.
     This is called on-demand to save API costs and improve UX.
     Includes caching to prevent duplicate generations for the same image+prompts.
+    The image itself is served as binary JPEG from /renovation-image/{cache_key}
+    rather than embedded as base64 in the JSON.
 
     Args:
         image_url: URL of the original property image
@@ -598,25 +1142,18 @@ async def generate_renovation_endpoint(request: GenerateRenovationRequest):
     Returns:
         {
             "success": true,
-            "renovated_image": "data:image/jpeg;base64,...",
+            "renovated_image": "http://.../renovation-image/{cache_key}",  # Usable as an <img> src
+            "image_endpoint": "/renovation-image/{cache_key}",
+            "cache_key": "...",
             "original_url": "...",
             "cached": false  # Whether result was from cache
         }
     """
     try:
         # Extract prompts from audit data
-        image_gen_prompt = request.audit_data.get("image_gen_prompt")
-        mask_prompt = request.audit_data.get("mask_prompt")
-
-        # Check for two-pass workflow
-        clear_mask = request.audit_data.get("clear_mask", "")
-        clear_prompt = request.audit_data.get("clear_prompt", "")
-        build_mask = request.audit_data.get("build_mask", "")
-        build_prompt = request.audit_data.get("build_prompt", "")
+        gen_kwargs = extract_gen_kwargs(request.audit_data)
 
-        is_two_pass = bool(clear_mask and clear_prompt and build_mask and build_prompt)
-
-        if not image_gen_prompt or not mask_prompt:
+        if not gen_kwargs:
             return {
                 "success": False,
                 "error": "No renovation prompts found in audit data",
@@ -625,63 +1162,88 @@ async def generate_renovation_endpoint(request: GenerateRenovationRequest):
 
         # Create cache key using helper function
         cache_key = get_cache_key(request.image_url, request.audit_data, request.wheelchair_accessible)
+        image_endpoint = f"/renovation-image/{cache_key}"
+        image_url = str(http_request.url_for("get_renovation_image", cache_key=cache_key))
 
         # Check cache first
-        if cache_key in image_generation_cache:
-            cached_result = image_generation_cache[cache_key]
-            print(f"Cache HIT for: {request.image_url[:50]}... (key: {cache_key[:8]})")
+        cached_result = await get_cached_renovation(cache_key)
+        if cached_result is not None:
+            logger.debug("Cache HIT for: %s... (key: %s)", request.image_url[:50], cache_key[:8])
             return {
                 "success": True,
-                "renovated_image": cached_result["renovated_image"],
-                "original_url": cached_result["original_url"],
+                "renovated_image": image_url,
+                "image_endpoint": image_endpoint,
+                "cache_key": cache_key,
+                "original_url": cached_result.original_url,
                 "cached": True
             }
 
-        print(f"Cache MISS - Generating renovation for: {request.image_url[:50]}... (key: {cache_key[:8]})")
+        logger.debug("Cache MISS - Generating renovation for: %s... (key: %s)", request.image_url[:50], cache_key[:8])
 
-        # Generate the renovation image
-        renovated_image_bytes = generate_renovation(
-            request.image_url,
-            image_gen_prompt,
-            mask_prompt,
-            is_two_pass=is_two_pass,
-            clear_mask=clear_mask if is_two_pass else None,
-            clear_prompt=clear_prompt if is_two_pass else None,
-            build_mask=build_mask if is_two_pass else None,
-            build_prompt=build_prompt if is_two_pass else None,
-            wheelchair_accessible=request.wheelchair_accessible
-        )
+        async def generate() -> dict:
+            # Generate the renovation image in the executor (synchronous function)
+            loop = asyncio.get_running_loop()
+            renovated_image_bytes = await loop.run_in_executor(
+                io_executor,
+                functools.partial(
+                    generate_renovation,
+                    request.image_url,
+                    **gen_kwargs,
+                    wheelchair_accessible=request.wheelchair_accessible
+                )
+            )
 
-        if renovated_image_bytes:
-            # Encode to base64
-            base64_encoded = base64.b64encode(renovated_image_bytes).decode('utf-8')
-            renovated_image_base64 = f"data:image/jpeg;base64,{base64_encoded}"
-
-            # Store in cache
-            image_generation_cache[cache_key] = {
-                "renovated_image": renovated_image_base64,
-                "original_url": request.image_url
-            }
-            print(f"Cached result for key: {cache_key[:16]}... (cache size: {len(image_generation_cache)})")
+            if renovated_image_bytes:
+                # Store in cache (served from /renovation-image/{cache_key})
+                await store_renovation(cache_key, CacheEntry(
+                    jpeg_bytes=renovated_image_bytes,
+                    original_url=request.image_url
+                ))
+                logger.debug("Cached result for key: %s... (cache size: %d)", cache_key[:16], len(image_generation_cache))
 
-            return {
-                "success": True,
-                "renovated_image": renovated_image_base64,
-                "original_url": request.image_url,
-                "cached": False
-            }
-        else:
-            return {
-                "success": False,
-                "error": "Image generation returned no data",
-                "renovated_image": None
-            }
+                return {
+                    "success": True,
+                    "renovated_image": image_url,
+                    "image_endpoint": image_endpoint,
+                    "cache_key": cache_key,
+                    "original_url": request.image_url,
+                    "cached": False
+                }
+            else:
+                return {
+                    "success": False,
+                    "error": "Image generation returned no data",
+                    "renovated_image": None
+                }
+
+        # Concurrent requests for the same image+prompts share one generation
+        return await single_flight(
+            renovation_inflight, renovation_inflight_lock, cache_key, generate
+        )
 
     except Exception as e:
-        print(f"Error generating renovation: {str(e)}")
+        logger.error("Error generating renovation: %s", e)
         return {
             "success": False,
             "error": f"Generation failed: {str(e)}",
             "renovated_image": None
         }
 
+# Serve a cached renovation image as binary JPEG (avoids base64-in-JSON overhead)
+@app.get("/renovation-image/{cache_key}")
+async def get_renovation_image(cache_key: str):
+    """
+    Return the raw JPEG bytes for a renovation generated by /generate-renovation.
+
+    Returns:
+        image/jpeg response, or 404 if the image is not (or no longer) cached
+    """
+    cached_result = await get_cached_renovation(cache_key)
+    if cached_result is None:
+        raise HTTPException(status_code=404, detail="Renovation image not found")
+
+    return Response(
+        content=cached_result.jpeg_bytes,
+        media_type="image/jpeg",
+        headers={"Cache-Control": "public, max-age=3600"}
+    )
@@ -4,11 +4,24 @@ Prompts for Gemini AI models used in accessibility analysis and renovation visua
 Edit these prompts to adjust the behavior of the AI analysis and image generation.
 """
 
+import functools
+import hashlib
+import re
+import sys
+from typing import Union
+import ahocorasick
+import orjson
+from pydantic import BaseModel, Field, TypeAdapter, ValidationError
+
 # ============================================================================
 # AUDIT PROMPT
 # ============================================================================
-# This prompt is used to analyze images and identify accessibility barriers
-AUDIT_PROMPT = """You are an expert Accessibility Architect (AODA compliant). Analyze this real estate photo.
+# This prompt is used to analyze images and identify accessibility barriers.
+# It is kept in sections, ordered from most to least stable, so that an edit
+# near the end leaves the longest possible prefix unchanged for prompt caching.
+
+# Role, spatial analysis and barrier identification
+_AUDIT_PROMPT_HEADER = """You are an expert Accessibility Architect (AODA compliant). Analyze this real estate photo.
 
 STEP 1 - SPATIAL ANALYSIS (CRITICAL):
 Before identifying barriers, carefully analyze:
@@ -18,42 +31,37 @@ Before identifying barriers, carefully analyze:
 - ACCESS POINTS: What pathways, driveways, or doors must remain unobstructed?
 
 STEP 2 - BARRIER IDENTIFICATION (PRIORITY ORDER):
-CRITICAL: First assess if this room actually has accessibility barriers:
-- If doorways are already 32+ inches wide, doorways are FINE - do not suggest modifications
-- If floors are already non-slip (textured, carpet, rubber), floors are FINE - do not suggest modifications
-- If there are no step-ups or thresholds, no ramps needed - do not suggest modifications
-- If bathroom already has walk-in shower and grab bars, bathroom is FINE - do not suggest modifications
-- If stairs already have proper handrails, stairs are FINE - do not suggest modifications
-- ONLY identify barriers that actually exist and need fixing
+CRITICAL: First assess if this room actually has accessibility barriers. ONLY identify barriers that actually exist and need fixing. These are already FINE - do not suggest modifications for them:
+- Doorways already 32+ inches wide
+- Floors already non-slip (textured, carpet, rubber)
+- No step-ups or thresholds (no ramps needed)
+- Bathrooms that already have a walk-in shower and grab bars
+- Stairs that already have proper handrails
 
-If NO barriers are found, set barrier_detected to "No accessibility barriers detected - room is already accessible" and set all renovation fields to empty strings.
+If NO barriers are found, set barrier_detected to "No accessibility barriers detected - room is already accessible" and set renovation_suggestion and all other renovation and image prompt fields to empty strings "".
 
 If barriers exist, identify the single most critical accessibility barrier, using this PRIORITY ORDER:
 1. HIGHEST PRIORITY: Narrow doorways (doorways less than 32 inches wide) - prioritize making doorways wider
 2. HIGH PRIORITY: Slippery flooring surfaces (polished tile, smooth hardwood, glossy surfaces) - prioritize replacing slippery floors
 3. HIGH PRIORITY: Small step-ups or thresholds (height differences of 1-4 inches) - prioritize adding small ramps
 4. MEDIUM PRIORITY: Bathroom barriers (high tubs, narrow vanities, lack of grab bars)
-5. LOWER PRIORITY: Stair handrails (only if no higher priority barriers exist)
-
-Be SPECIFIC about the exact location and nature of the barrier. DO NOT prioritize stair handrail modifications when doorways, flooring, or small steps are present. DO NOT suggest modifications for rooms that are already accessible.
+5. LOWER PRIORITY: Stair handrails (only if no higher priority barriers exist - never when doorways, flooring, or small steps need attention)
 
-STEP 3 - FEASIBLE SOLUTION SELECTION:
+Be SPECIFIC about the exact location and nature of the barrier."""
 
-*** IF NO BARRIERS EXIST ***
-- If the room is already accessible with no barriers, set renovation_suggestion to empty string ""
-- Do not generate image prompts for rooms that don't need changes
-- Only suggest renovations when actual barriers are present
+# Banned solutions
+_AUDIT_PROMPT_BANNED = """STEP 3 - FEASIBLE SOLUTION SELECTION:
 
 *** ABSOLUTELY DO NOT SUGGEST - THESE ARE BANNED ***
 - NO elevators, lifts, platform lifts, or vertical lifts (infeasible for residential)
-- NO ramps that would block driveways, pathways, sidewalks, or adjacent doors
-- NO railings that form fences, cages, or enclosures - railings must be OPEN handrails only
+- NO ramps that would block driveways, pathways, sidewalks, or adjacent doors - ramps need clear space on all sides
+- NO railings that form fences, cages, or enclosures - railings must be OPEN handrails that people can pass by
 - NO major structural changes requiring foundation work
 - NO solutions that block or restrict existing access points
-- NO creating new walls, partitions, or structural divisions
-- NO building new walls or barriers
+- NO new walls, partitions, barriers, or structural divisions"""
 
-*** PREFERRED SOLUTIONS (choose from this list in order of preference) ***
+# Preferred solutions and cost tiers
+_AUDIT_PROMPT_SOLUTIONS = """*** PREFERRED SOLUTIONS (choose from this list in order of preference) ***
 PRIORITY SOLUTIONS (prefer these when applicable):
 - Door widening: Widen narrow doorways to minimum 32 inches (preferably 36 inches) clear width
 - Floor replacement: Replace slippery floors with non-slip flooring (textured tile, non-slip vinyl, rubber flooring, low-pile carpet)
@@ -63,28 +71,85 @@ OTHER SOLUTIONS (when priority solutions don't apply):
 1. SIMPLE ADDITIONS ($50-500): Grab bars, lever door handles, non-slip mats, contrast tape, signage
 2. MINOR MODIFICATIONS ($500-2000): Threshold ramps (small, portable), door widening, sink height adjustment, toilet risers
 3. MODERATE CHANGES ($2000-5000): Walk-in shower conversion, cabinet removal for knee clearance, handrail installation along walls (ONLY when no doorways/floors/steps need attention)
-4. ONLY IF ABSOLUTELY NECESSARY ($5000+): Exterior ramp (MUST have clear space, NOT blocking driveway)
-
-STEP 4 - DETAILED DESCRIPTION REQUIREMENTS:
-Return a strict JSON object with these keys:
-- barrier_detected: string (DETAILED description including EXACT location, e.g., "Standard bathtub with high sides (24 inches) in the main floor bathroom, located against the left wall")
-- renovation_suggestion: string (SPECIFIC fix from preferred solutions above, e.g., "Remove bathtub and install curbless walk-in shower with grab bars on three walls and fold-down bench seat")
-- cost_estimate: string (A range of estimated costs in USD, e.g., "$1,500 - $3,000". Conservative pricing: grab bars $50-200, threshold ramps $100-300, door widening $800-1500, floor replacement $2000-5000 per room, walk-in shower $3000-6000)
-- compliance_note: string (MUST reference specific AODA standards, e.g., 'AODA Section 4.3.2: Grab bar height 33-36 inches above floor, must support 250 lbs')
-- clear_mask: string (For renovations requiring removal: describe EXACTLY what to remove with precise location, e.g., "the white porcelain bathtub with chrome fixtures against the left bathroom wall". For simple additions, use empty string "")
-- clear_prompt: string (For removals: describe replacement, e.g., "matching tile floor extending to the wall, seamless with existing flooring". For simple additions, use empty string "")
-- build_mask: string (MUST describe the EXACT area including surrounding space. Be VERY specific about location: "the left wall area of the bathroom where the tub was removed, including 6 inches of floor space on all sides for proper drainage slope")
-- build_prompt: string (MUST start with safety features FIRST. Include SPECIFIC details: "Brushed nickel grab bars (36 inches long, 1.5 inch diameter) mounted horizontally at 36 inches height on the left and back walls, curbless tile shower floor with linear drain, fold-down teak bench seat mounted at 18 inches height, handheld shower head on adjustable slide bar, photorealistic, 8k quality")
-- mask_prompt: string (Same as build_mask for structural, otherwise describe area to modify with EXACT location)
-- image_gen_prompt: string (Same as build_prompt for structural, otherwise detailed prompt for additions - ALWAYS specify exact positions, materials, and dimensions)
-
-CRITICAL REMINDERS:
-- PRIORITIZE doorways, flooring, and small steps over stair modifications
-- Handrails must be OPEN (not fences or cages) - people must be able to pass by them
-- Ramps must NOT block driveways or pathways - ensure clear space on all sides
+4. ONLY IF ABSOLUTELY NECESSARY ($5000+): Exterior ramp (MUST have clear space, NOT blocking driveway)"""
+
+# Output format (the keys themselves are described by AuditResult below, which is
+# passed to Gemini as the response schema)
+_AUDIT_PROMPT_JSON_SCHEMA = """STEP 4 - DETAILED DESCRIPTION REQUIREMENTS:
+Return a JSON object matching the provided schema. Be DETAILED and SPECIFIC in every field - ALWAYS give exact locations, materials, and dimensions."""
+
+# Reminders
+_AUDIT_PROMPT_FOOTER = """CRITICAL REMINDERS:
 - All measurements must be AODA compliant (doorways minimum 32" clear width, ramp slope max 1:12)
-- Prefer simple solutions over complex structural changes
-- Do NOT suggest stair handrail modifications when doorways need widening, floors need replacement, or small steps need ramps"""
+- Prefer simple solutions over complex structural changes"""
+
+# Interned so every lookup hands out the one shared string object
+AUDIT_PROMPT = sys.intern("\n\n".join((
+    _AUDIT_PROMPT_HEADER,
+    _AUDIT_PROMPT_BANNED,
+    _AUDIT_PROMPT_SOLUTIONS,
+    _AUDIT_PROMPT_JSON_SCHEMA,
+    _AUDIT_PROMPT_FOOTER,
+)))
+
+# Short content hash of the audit prompt; cached audits are keyed on it so editing
+# the prompt never serves results produced by an older version
+AUDIT_PROMPT_VERSION = hashlib.blake2s(AUDIT_PROMPT.encode('utf-8'), digest_size=8).hexdigest()
+
+
+# Audit prompt per wheelchair_accessible flag, built once at import.
+# For now both use the standard prompt; a wheelchair-specific variant goes here.
+_AUDIT_PROMPTS = {
+    False: AUDIT_PROMPT,
+    True: AUDIT_PROMPT,
+}
+
+
+class AuditResult(BaseModel):
+    """Response schema for the audit prompt (sent to Gemini as structured output)."""
+    barrier_detected: str = Field(description='DETAILED description including EXACT location, e.g., "Standard bathtub with high sides (24 inches) in the main floor bathroom, located against the left wall"')
+    renovation_suggestion: str = Field(description='SPECIFIC fix from preferred solutions, e.g., "Remove bathtub and install curbless walk-in shower with grab bars on three walls and fold-down bench seat"')
+    cost_estimate: str = Field(description='A range of estimated costs in USD, e.g., "$1,500 - $3,000". Conservative pricing: grab bars $50-200, threshold ramps $100-300, door widening $800-1500, floor replacement $2000-5000 per room, walk-in shower $3000-6000')
+    compliance_note: str = Field(description="MUST reference specific AODA standards, e.g., 'AODA Section 4.3.2: Grab bar height 33-36 inches above floor, must support 250 lbs'")
+    clear_mask: str = Field(default="", description='For renovations requiring removal: describe EXACTLY what to remove with precise location, e.g., "the white porcelain bathtub with chrome fixtures against the left bathroom wall". For simple additions, use empty string ""')
+    clear_prompt: str = Field(default="", description='For removals: describe replacement, e.g., "matching tile floor extending to the wall, seamless with existing flooring". For simple additions, use empty string ""')
+    build_mask: str = Field(description='MUST describe the EXACT area including surrounding space. Be VERY specific about location: "the left wall area of the bathroom where the tub was removed, including 6 inches of floor space on all sides for proper drainage slope"')
+    build_prompt: str = Field(description='MUST start with safety features FIRST. Include SPECIFIC details: "Brushed nickel grab bars (36 inches long, 1.5 inch diameter) mounted horizontally at 36 inches height on the left and back walls, curbless tile shower floor with linear drain, fold-down teak bench seat mounted at 18 inches height, handheld shower head on adjustable slide bar, photorealistic, 8k quality"')
+    mask_prompt: str = Field(description="Same as build_mask for structural, otherwise describe area to modify with EXACT location")
+    image_gen_prompt: str = Field(description="Same as build_prompt for structural, otherwise detailed prompt for additions - ALWAYS specify exact positions, materials, and dimensions")
+
+
+# Built once: parses and validates a raw audit response (one object, or an array
+# for batched audits) in a single pass in pydantic-core
+AUDIT_RESPONSE_ADAPTER = TypeAdapter(Union[AuditResult, list[AuditResult]])
+
+
+def parse_audit_response(raw: Union[str, bytes]) -> Union[AuditResult, list[AuditResult]]:
+    """
+    Parses and validates a raw audit response.
+    
+    Well-formed JSON takes the single-pass pydantic-core path. If the text is not
+    valid JSON (e.g. wrapped in markdown fences or prose), the outermost JSON
+    object/array is cut out and parsed with orjson instead.
+    
+    Raises:
+        pydantic.ValidationError: If the response is not a valid audit
+    """
+    try:
+        return AUDIT_RESPONSE_ADAPTER.validate_json(raw)
+    except ValidationError as e:
+        if e.errors()[0]["type"] != "json_invalid":
+            raise
+        text = raw.decode('utf-8', errors='replace') if isinstance(raw, bytes) else raw
+        starts = [i for i in (text.find("{"), text.find("[")) if i != -1]
+        end = max(text.rfind("}"), text.rfind("]"))
+        if not starts or end < min(starts):
+            raise
+        try:
+            payload = orjson.loads(text[min(starts):end + 1])
+        except orjson.JSONDecodeError:
+            raise e
+        return AUDIT_RESPONSE_ADAPTER.validate_python(payload)
 
 
 def get_audit_prompt(wheelchair_accessible: bool = False) -> str:
@@ -98,91 +163,230 @@ def get_audit_prompt(wheelchair_accessible: bool = False) -> str:
     Returns:
         The formatted audit prompt string
     """
-    # For now, return the standard prompt
-    # In the future, this could be modified based on wheelchair_accessible flag
-    return AUDIT_PROMPT
+    return _AUDIT_PROMPTS[bool(wheelchair_accessible)]
+
+
+# Per-image user turn sent alongside the photo. The audit prompt itself goes in the
+# system instruction so the request prefix is identical on every call and Gemini's
+# implicit context cache can reuse it; anything that varies belongs here, after it.
+AUDIT_USER_PROMPT = "Audit this photo and return the JSON object described in your instructions."
+
+
+def get_audit_prompt_messages(wheelchair_accessible: bool = False) -> tuple[str, str]:
+    """
+    Returns the audit prompt split for prefix caching.
+    
+    Args:
+        wheelchair_accessible: If True, focus on wheelchair-accessible modifications;
+                               If False, apply general accessibility improvements
+        
+    Returns:
+        (system_instruction, user_prompt) - the static system instruction and the
+        per-image user prompt to send with the photo
+    """
+    return get_audit_prompt(wheelchair_accessible), AUDIT_USER_PROMPT
+
+
+# User turn for auditing several photos in one request (same system instruction).
+# Each photo follows a "Photo N:" marker.
+AUDIT_BATCH_USER_PROMPT = "Audit each of the {count} photos below independently. Return a JSON array with exactly {count} objects, one per photo in the same order, each matching the provided schema."
+
+
+def get_audit_batch_prompt_messages(count: int, wheelchair_accessible: bool = False) -> tuple[str, str]:
+    """
+    Returns the audit prompt for a batch of photos sent in a single request.
+    
+    Args:
+        count: Number of photos in the request
+        wheelchair_accessible: If True, focus on wheelchair-accessible modifications;
+                               If False, apply general accessibility improvements
+        
+    Returns:
+        (system_instruction, user_prompt) - the static system instruction (shared
+        with single-photo audits) and the batch user prompt
+    """
+    return get_audit_prompt(wheelchair_accessible), AUDIT_BATCH_USER_PROMPT.format(count=count)
 
 
 # ============================================================================
 # IMAGE GENERATION PROMPTS - STRUCTURED ARCHITECTURAL IN-PAINTING FORMAT
 # ============================================================================
 
-# Hardcoded negative prompt to prevent physics hallucinations
-NEGATIVE_PROMPT = "floating structures, disconnected stairs, creating new walls, building new walls, constructing new walls, adding new walls, creating new partitions, building new partitions, creating new barriers, building new barriers, creating new staircases, building new staircases, constructing new staircases, impossible geometry, cartoon, blurry, ramps leading to nowhere, floating stair lifts, disconnected ramps, unsupported structures, defying gravity, architectural impossibility, non-physical connections, gaps between surfaces, levitating objects, ramps without foundation, stairs without support, handrails without attachment points, grab bars floating in air, new structural walls, new interior walls, new exterior walls, wall construction, wall addition, creating barriers, building barriers, new room divisions, new partitions, structural additions that create walls"
+# Hardcoded negative prompt to prevent physics hallucinations. One canonical phrase per
+# concept: the verb variants ("creating/building/constructing/adding new walls") are
+# spelled out once in the template's CRITICAL PROHIBITIONS list instead of here
+NEGATIVE_PROMPT_PHRASES = (
+    "floating structures", "disconnected stairs", "new walls (interior, exterior, or structural)",
+    "new partitions or room divisions", "new barriers", "new staircases", "impossible geometry",
+    "cartoon", "blurry", "ramps leading to nowhere", "floating stair lifts", "disconnected ramps",
+    "unsupported structures", "defying gravity", "architectural impossibility",
+    "non-physical connections", "gaps between surfaces", "levitating objects",
+    "ramps without foundation", "stairs without support", "handrails without attachment points",
+    "grab bars floating in air", "structural additions that create walls"
+)
 
 # Style enforcers for realism
-STYLE_ENFORCERS = "photorealistic, architectural render, 8k resolution, unreal engine 5 quality, seamless blend, physically accurate, structurally sound, proper weight distribution, realistic shadows, natural lighting integration, material consistency, texture matching, perspective accuracy, depth of field, professional photography"
+STYLE_ENFORCER_PHRASES = (
+    "photorealistic", "architectural render", "8k resolution", "unreal engine 5 quality",
+    "seamless blend", "physically accurate", "structurally sound", "proper weight distribution",
+    "realistic shadows", "natural lighting integration", "material consistency", "texture matching",
+    "perspective accuracy", "depth of field", "professional photography"
+)
+
+# Joined once at import (dict.fromkeys drops any repeated phrase, keeping first-seen order)
+NEGATIVE_PROMPT = ", ".join(dict.fromkeys(NEGATIVE_PROMPT_PHRASES))
+STYLE_ENFORCERS = ", ".join(dict.fromkeys(STYLE_ENFORCER_PHRASES))
+
+# Location keywords used to classify a renovation as interior or exterior
+_INTERIOR_KEYWORDS = frozenset((
+    "bathroom", "kitchen", "bedroom", "hallway", "interior", "inside", "room", "tub", "shower",
+    "vanity", "sink", "toilet", "cabinet", "closet", "living room", "dining room", "basement"
+))
+_EXTERIOR_KEYWORDS = frozenset((
+    "exterior", "front entrance", "driveway", "garage", "backyard", "outdoor", "outside",
+    "porch", "steps", "stairs", "sidewalk", "pathway", "patio", "deck", "balcony"
+))
+
+# Every other keyword _extract_anchor_context checks (materials, lighting, angle)
+_ANCHOR_KEYWORDS = frozenset((
+    "brick", "tile", "ceramic", "porcelain tile", "wood", "hardwood", "wooden", "floor", "wall",
+    "paneling", "concrete", "vinyl", "porcelain", "fixture", "chrome", "brushed nickel",
+    "stainless steel", "marble", "granite", "carpet", "laminate", "drywall", "sheetrock", "stucco",
+    "siding", "night", "evening", "dark", "corridor", "front", "entrance", "front door", "side",
+    "lateral", "corner", "angled", "perpendicular", "overhead", "top", "aerial", "back", "rear",
+    "diagonal", "doorway"
+))
+
+# Every keyword _construct_integration_action checks
+_ACTION_KEYWORDS = frozenset((
+    "ramp", "threshold", "step", "step-up", "driveway", "door", "entrance", "front", "porch",
+    "exterior", "outdoor", "grab bar", "grab bars", "bathroom", "shower", "tub", "horizontal",
+    "vertical", "handrail", "railing", "rail", "wall", "along", "stair", "staircase", "steps",
+    "widen", "doorway", "wider", "32", "36", "floor", "replace", "non-slip", "textured", "tile",
+    "vinyl", "rubber", "walk-in shower", "curbless", "shower conversion", "threshold ramp",
+    "portable ramp", "lever", "handle", "bench", "seat", "fold", "fold-down", "toilet", "riser",
+    "higher", "sink", "height", "adjust", "sign", "signage", "mat", "add", "install", "remove"
+))
+
+# Room-specific lighting for interiors, checked in priority order
+_ROOM_LIGHTING_RULES = (
+    (frozenset({"bedroom"}), "soft interior lighting (typically warm, ambient lighting)"),
+    (frozenset({"hallway", "corridor"}), "hallway lighting (typically overhead, even illumination)"),
+    (frozenset({"garage"}), "garage lighting (typically bright overhead fluorescent or LED lighting)"),
+)
+
+# Viewing angle keywords, checked in priority order
+_ANGLE_RULES = (
+    (frozenset({"front", "entrance", "front door"}), "front porch view, front entrance perspective"),
+    (frozenset({"side", "lateral"}), "side view, lateral perspective"),
+    (frozenset({"corner", "angled"}), "corner view, angled perspective"),
+    (frozenset({"wall", "perpendicular"}), "wall-facing view, perpendicular perspective"),
+    (frozenset({"overhead", "top", "aerial"}), "overhead view, top-down perspective"),
+    (frozenset({"back", "rear"}), "rear view, back perspective"),
+    (frozenset({"diagonal"}), "diagonal view, angled perspective"),
+)
+
+
+def _build_keyword_automaton(*keyword_groups) -> ahocorasick.Automaton:
+    """Builds an Aho-Corasick automaton whose value for each keyword is the keyword itself."""
+    automaton = ahocorasick.Automaton()
+    for keywords in keyword_groups:
+        for keyword in keywords:
+            automaton.add_word(keyword, keyword)
+    automaton.make_automaton()
+    return automaton
+
+
+_ANCHOR_AUTOMATON = _build_keyword_automaton(_INTERIOR_KEYWORDS, _EXTERIOR_KEYWORDS, _ANCHOR_KEYWORDS)
+_ACTION_AUTOMATON = _build_keyword_automaton(_ACTION_KEYWORDS)
+
+
+def _keyword_hits(automaton: ahocorasick.Automaton, text: str) -> frozenset:
+    """
+    Returns the set of keywords that occur anywhere in text, in a single pass.
+
+    Matches are plain substring occurrences (overlaps included), so `keyword in hits`
+    is equivalent to `keyword in text` for every keyword the automaton was built with.
+    """
+    return frozenset(keyword for _, keyword in automaton.iter(text))
 
 
-def _extract_anchor_context(identified_problem: str, proposed_solution: str, mask_prompt: str = "") -> str:
+def _extract_anchor_context(problem_lower: str, solution_lower: str, mask_lower: str = "") -> str:
     """
     Extracts and constructs the Anchor (Context) component describing existing house material, lighting, and angle.
     Covers ALL cases with specific material, lighting, and angle descriptions.
     
     Args:
-        identified_problem: The identified accessibility barrier/problem
-        proposed_solution: The proposed renovation solution
-        mask_prompt: Optional description of the area to modify (for additional context)
+        problem_lower: The identified accessibility barrier/problem, lowercased
+        solution_lower: The proposed renovation solution, lowercased
+        mask_lower: Optional description of the area to modify (for additional context), lowercased
         
     Returns:
         Anchor context string describing existing materials, lighting, and viewing angle
     """
     # Analyze the problem and solution to infer context
-    problem_lower = identified_problem.lower()
-    solution_lower = proposed_solution.lower()
-    mask_lower = mask_prompt.lower() if mask_prompt else ""
     combined_text = f"{problem_lower} {mask_lower} {solution_lower}"
+    return _anchor_for_hits(_keyword_hits(_ANCHOR_AUTOMATON, combined_text))
+
+
+# The anchor depends only on which keywords matched, not on the exact wording, so
+# near-duplicate barrier descriptions ("grab bar in shower" / "grab bars, shower")
+# share one cache entry
+@functools.lru_cache(maxsize=1024)
+def _anchor_for_hits(hits: frozenset) -> str:
+    """
+    Builds the anchor context (materials, lighting, angle) from the matched keywords.
     
+    Args:
+        hits: Anchor keywords found in the combined problem/mask/solution text
+        
+    Returns:
+        Anchor context string describing existing materials, lighting, and viewing angle
+    """
     # Determine location (interior vs exterior) - comprehensive detection
-    is_interior = any(keyword in combined_text for keyword in [
-        "bathroom", "kitchen", "bedroom", "hallway", "interior", "inside", "room", "tub", "shower", 
-        "vanity", "sink", "toilet", "cabinet", "closet", "living room", "dining room", "basement"
-    ])
-    is_exterior = any(keyword in combined_text for keyword in [
-        "exterior", "front entrance", "driveway", "garage", "backyard", "outdoor", "outside", 
-        "porch", "steps", "stairs", "sidewalk", "pathway", "patio", "deck", "balcony"
-    ])
+    is_interior = not _INTERIOR_KEYWORDS.isdisjoint(hits)
+    is_exterior = not _EXTERIOR_KEYWORDS.isdisjoint(hits)
     
     # Infer materials from context - comprehensive material detection
     materials = []
-    if "brick" in combined_text:
+    if "brick" in hits:
         materials.append("brick exterior or brick wall")
-    if "tile" in combined_text or "ceramic" in combined_text or "porcelain tile" in combined_text:
+    if "tile" in hits or "ceramic" in hits or "porcelain tile" in hits:
         materials.append("ceramic or porcelain tile")
-    if "wood" in combined_text or "hardwood" in combined_text or "wooden" in combined_text:
-        if "floor" in combined_text:
+    if "wood" in hits or "hardwood" in hits or "wooden" in hits:
+        if "floor" in hits:
             materials.append("hardwood flooring")
-        elif "wall" in combined_text or "paneling" in combined_text:
+        elif "wall" in hits or "paneling" in hits:
             materials.append("wood paneling")
         else:
             materials.append("wood or hardwood materials")
-    if "concrete" in combined_text:
+    if "concrete" in hits:
         materials.append("concrete")
-    if "vinyl" in combined_text:
+    if "vinyl" in hits:
         materials.append("vinyl flooring")
-    if "porcelain" in combined_text and ("fixture" in combined_text or "tub" in combined_text or "sink" in combined_text):
+    if "porcelain" in hits and ("fixture" in hits or "tub" in hits or "sink" in hits):
         materials.append("porcelain fixtures")
-    if "chrome" in combined_text or "brushed nickel" in combined_text or "stainless steel" in combined_text:
+    if "chrome" in hits or "brushed nickel" in hits or "stainless steel" in hits:
         materials.append("chrome, brushed nickel, or stainless steel fixtures")
-    if "marble" in combined_text or "granite" in combined_text:
+    if "marble" in hits or "granite" in hits:
         materials.append("marble or granite surfaces")
-    if "carpet" in combined_text:
+    if "carpet" in hits:
         materials.append("carpet flooring")
-    if "laminate" in combined_text:
+    if "laminate" in hits:
         materials.append("laminate flooring")
-    if "drywall" in combined_text or "sheetrock" in combined_text:
+    if "drywall" in hits or "sheetrock" in hits:
         materials.append("drywall walls")
-    if "stucco" in combined_text:
+    if "stucco" in hits:
         materials.append("stucco exterior")
-    if "siding" in combined_text:
+    if "siding" in hits:
         materials.append("siding exterior")
     
     # Default materials if none detected - be specific based on location
     if not materials:
         if is_interior:
-            if "bathroom" in combined_text:
+            if "bathroom" in hits:
                 materials.append("bathroom wall and floor materials (typically tile, vinyl, or painted drywall)")
-            elif "kitchen" in combined_text:
+            elif "kitchen" in hits:
                 materials.append("kitchen wall and floor materials (typically tile, hardwood, or laminate)")
             else:
                 materials.append("interior wall and floor materials")
@@ -192,87 +396,89 @@ def _extract_anchor_context(identified_problem: str, proposed_solution: str, mas
             materials.append("existing architectural materials")
     
     # Infer lighting conditions - comprehensive lighting detection
-    lighting = "daylight"  # Default
-    if "bathroom" in combined_text:
+    if "bathroom" in hits:
         lighting = "bathroom lighting (warm white, even illumination, typically overhead and vanity lighting)"
-    elif "kitchen" in combined_text:
+    elif "kitchen" in hits:
         lighting = "kitchen lighting (bright, task-oriented, typically overhead and under-cabinet lighting)"
     elif is_exterior:
-        if "night" in combined_text or "evening" in combined_text or "dark" in combined_text:
+        if "night" in hits or "evening" in hits or "dark" in hits:
             lighting = "evening or nighttime outdoor lighting"
         else:
             lighting = "natural daylight, outdoor lighting with natural shadows"
-    elif "bedroom" in combined_text:
-        lighting = "soft interior lighting (typically warm, ambient lighting)"
-    elif "hallway" in combined_text or "corridor" in combined_text:
-        lighting = "hallway lighting (typically overhead, even illumination)"
-    elif "garage" in combined_text:
-        lighting = "garage lighting (typically bright overhead fluorescent or LED lighting)"
-    elif is_interior:
-        lighting = "interior lighting (warm, ambient room lighting)"
-    
-    # Infer viewing angle - comprehensive angle detection
-    angle = "front view"  # Default
-    if "front" in combined_text or "entrance" in combined_text or "front door" in combined_text:
-        angle = "front porch view, front entrance perspective"
-    elif "side" in combined_text or "lateral" in combined_text:
-        angle = "side view, lateral perspective"
-    elif "corner" in combined_text or "angled" in combined_text:
-        angle = "corner view, angled perspective"
-    elif "wall" in combined_text or "perpendicular" in combined_text:
-        angle = "wall-facing view, perpendicular perspective"
-    elif "overhead" in combined_text or "top" in combined_text or "aerial" in combined_text:
-        angle = "overhead view, top-down perspective"
-    elif "back" in combined_text or "rear" in combined_text:
-        angle = "rear view, back perspective"
-    elif "diagonal" in combined_text:
-        angle = "diagonal view, angled perspective"
-    elif is_exterior and "driveway" in combined_text:
-        angle = "driveway view, approach perspective"
-    elif is_interior and "doorway" in combined_text:
-        angle = "doorway view, entry perspective"
-    
-    # Construct anchor context
-    material_str = ", ".join(materials)
-    anchor = f"{material_str}, {lighting}, {angle}"
-    
-    return anchor
-
-
-def _construct_integration_action(identified_problem: str, proposed_solution: str, mask_prompt: str = "") -> str:
+    else:
+        default_lighting = "interior lighting (warm, ambient room lighting)" if is_interior else "daylight"
+        lighting = next(
+            (value for keywords, value in _ROOM_LIGHTING_RULES if not keywords.isdisjoint(hits)),
+            default_lighting
+        )
+    
+    # Infer viewing angle - comprehensive angle detection (first matching rule wins)
+    angle = next((value for keywords, value in _ANGLE_RULES if not keywords.isdisjoint(hits)), None)
+    if angle is None:
+        if is_exterior and "driveway" in hits:
+            angle = "driveway view, approach perspective"
+        elif is_interior and "doorway" in hits:
+            angle = "doorway view, entry perspective"
+        else:
+            angle = "front view"  # Default
+    
+    # Construct anchor context in a single join
+    return ", ".join((*materials, lighting, angle))
+
+
+def _construct_integration_action(problem_lower: str, solution_lower: str, mask_lower: str = "") -> str:
     """
     Constructs the Integration (Action) component using strong connection verbs.
     Covers ALL cases with specific connection descriptions to prevent floating structures.
     
     Args:
-        identified_problem: The identified accessibility barrier/problem
-        proposed_solution: The proposed renovation solution
-        mask_prompt: Optional description of the area to modify
+        problem_lower: The identified accessibility barrier/problem, lowercased
+        solution_lower: The proposed renovation solution, lowercased
+        mask_lower: Optional description of the area to modify, lowercased
         
     Returns:
         Integration action string with strong connection verbs
     """
-    solution_lower = proposed_solution.lower()
-    problem_lower = identified_problem.lower()
-    mask_lower = mask_prompt.lower() if mask_prompt else ""
-    combined_text = f"{solution_lower} {problem_lower} {mask_lower}"
+    # Scan each part once. Every keyword checked against the combined text is a single
+    # word, so it can never straddle the joining spaces and the combined hits are just
+    # the union of the per-part hits
+    solution_hits = _keyword_hits(_ACTION_AUTOMATON, solution_lower)
+    problem_hits = _keyword_hits(_ACTION_AUTOMATON, problem_lower)
+    combined_hits = solution_hits | problem_hits | _keyword_hits(_ACTION_AUTOMATON, mask_lower)
+    return _integration_for_hits(solution_hits, problem_hits, combined_hits)
+
+
+# Like _anchor_for_hits: the action text depends only on which triggers matched, so
+# inputs that differ in wording but not in triggers share one cache entry
+@functools.lru_cache(maxsize=1024)
+def _integration_for_hits(solution_hits: frozenset, problem_hits: frozenset, combined_hits: frozenset) -> str:
+    """
+    Builds the integration action text from the matched action keywords.
     
+    Args:
+        solution_hits: Action keywords found in the lowercased solution
+        problem_hits: Action keywords found in the lowercased problem
+        combined_hits: Action keywords found in the solution, problem or mask
+        
+    Returns:
+        Integration action string with strong connection verbs
+    """
     # Extract key elements from solution
     action_parts = []
     
     # Handle ramps - use strong connection verbs with specific connection points
-    if "ramp" in solution_lower:
-        if "threshold" in solution_lower or "threshold" in problem_lower or "step" in problem_lower or "step-up" in problem_lower:
+    if "ramp" in solution_hits:
+        if "threshold" in solution_hits or "threshold" in problem_hits or "step" in problem_hits or "step-up" in problem_hits:
             # Threshold ramp connecting two surfaces - SPECIFIC CONNECTIONS
-            if "driveway" in combined_text:
+            if "driveway" in combined_hits:
                 action_parts.append("a concrete ramp connecting the driveway surface directly to the front door threshold, with the ramp's bottom edge flush against the driveway and top edge flush against the door threshold, seamlessly bridging the height difference with proper foundation support")
-            elif "door" in combined_text or "entrance" in combined_text or "front" in combined_text:
+            elif "door" in combined_hits or "entrance" in combined_hits or "front" in combined_hits:
                 action_parts.append("a concrete ramp connecting the ground level directly to the front door threshold, with the ramp's base resting on the ground surface and top edge meeting the door threshold, creating a continuous accessible pathway with proper structural support")
-            elif "porch" in combined_text:
+            elif "porch" in combined_hits:
                 action_parts.append("a concrete ramp connecting the ground level to the porch surface, with the ramp's bottom edge anchored to the ground and top edge flush with the porch floor, bridging the step-up with proper slope and foundation")
             else:
                 action_parts.append("a concrete ramp connecting the lower surface directly to the upper surface, with the ramp's bottom edge flush against the lower surface and top edge flush against the upper surface, bridging the step-up with proper slope and structural foundation")
-        elif "exterior" in combined_text or "outdoor" in combined_text:
+        elif "exterior" in combined_hits or "outdoor" in combined_hits:
             # Exterior ramp
             action_parts.append("a concrete ramp connecting the existing ground plane directly to the elevated entrance, with the ramp's foundation embedded in the ground and top edge meeting the entrance threshold, with proper structural support and clear space on all sides")
         else:
@@ -280,11 +486,11 @@ def _construct_integration_action(identified_problem: str, proposed_solution: st
             action_parts.append("a concrete ramp connecting the existing ground plane directly to the elevated surface, with the ramp's bottom edge anchored to the ground and top edge meeting the elevated surface, with proper foundation and structural support")
     
     # Handle grab bars - wall-mounted connections with specific attachment points
-    if "grab bar" in solution_lower or "grab bars" in solution_lower:
-        if "bathroom" in combined_text or "shower" in combined_text or "tub" in combined_text:
-            if "horizontal" in solution_lower:
+    if "grab bar" in solution_hits or "grab bars" in solution_hits:
+        if "bathroom" in combined_hits or "shower" in combined_hits or "tub" in combined_hits:
+            if "horizontal" in solution_hits:
                 action_parts.append("brushed nickel grab bars mounted directly to the wall studs with visible wall anchors, securely attached at 36 inches height, with the grab bars flush against the wall surface and properly supported by wall studs")
-            elif "vertical" in solution_lower:
+            elif "vertical" in solution_hits:
                 action_parts.append("brushed nickel vertical grab bars mounted directly to the wall studs with visible wall anchors, securely attached from floor to appropriate height, with the grab bars flush against the wall surface")
             else:
                 action_parts.append("brushed nickel grab bars mounted directly to the wall studs with visible wall anchors, securely anchored at 36 inches height, with the grab bars flush against the wall surface and properly supported by structural wall studs")
@@ -292,147 +498,92 @@ def _construct_integration_action(identified_problem: str, proposed_solution: st
             action_parts.append("grab bars mounted to the wall surface with visible wall anchors, properly secured to wall studs, with the grab bars flush against the wall and showing proper structural attachment")
     
     # Handle handrails - along existing surfaces with specific mounting
-    if "handrail" in solution_lower or "railing" in solution_lower or "rail" in solution_lower:
-        if "wall" in combined_text or "along" in solution_lower:
+    if "handrail" in solution_hits or "railing" in solution_hits or "rail" in solution_hits:
+        if "wall" in combined_hits or "along" in solution_hits:
             action_parts.append("an open handrail mounted directly to the existing wall surface with visible wall brackets, allowing free passage on both sides, with the handrail properly attached to wall studs or posts")
-        elif "stair" in combined_text or "staircase" in combined_text or "steps" in combined_text:
+        elif "stair" in combined_hits or "staircase" in combined_hits or "steps" in combined_hits:
             action_parts.append("an open handrail mounted directly to the wall adjacent to the stairs with visible wall brackets, following the stair slope, with the handrail properly attached to wall studs and allowing free passage")
         else:
             action_parts.append("an open handrail mounted along the existing wall surface with visible wall brackets or posts, properly secured to structural supports, allowing free passage on both sides")
     
     # Handle door widening - specific integration
-    if "widen" in solution_lower or ("doorway" in solution_lower and ("wider" in solution_lower or "32" in solution_lower or "36" in solution_lower)):
+    if "widen" in solution_hits or ("doorway" in solution_hits and ("wider" in solution_hits or "32" in solution_hits or "36" in solution_hits)):
         action_parts.append("a widened doorway opening integrated into the existing door frame structure, with the new opening properly framed and supported by structural headers, maintaining structural integrity of the surrounding wall")
     
     # Handle floor replacement - specific surface connections
-    if "floor" in solution_lower and ("replace" in solution_lower or "non-slip" in solution_lower or "textured" in solution_lower):
-        if "tile" in solution_lower:
+    if "floor" in solution_hits and ("replace" in solution_hits or "non-slip" in solution_hits or "textured" in solution_hits):
+        if "tile" in solution_hits:
             action_parts.append("textured non-slip tile flooring installed directly over the existing subfloor, with tiles properly grouted and seamlessly extending to adjacent surfaces and walls, maintaining consistent floor level")
-        elif "vinyl" in solution_lower:
+        elif "vinyl" in solution_hits:
             action_parts.append("non-slip vinyl flooring installed directly over the existing subfloor, with the flooring material properly adhered and seamlessly extending to adjacent surfaces, maintaining consistent floor level")
-        elif "rubber" in solution_lower:
+        elif "rubber" in solution_hits:
             action_parts.append("rubber flooring installed directly over the existing subfloor, with the material properly secured and seamlessly extending to adjacent surfaces, maintaining consistent floor level")
         else:
             action_parts.append("non-slip flooring material installed directly over the existing subfloor, with the material properly secured and seamlessly extending to adjacent surfaces and walls, maintaining consistent floor level")
     
     # Handle walk-in shower - specific floor integration
-    if "walk-in shower" in solution_lower or "curbless" in solution_lower or "shower conversion" in solution_lower:
+    if "walk-in shower" in solution_hits or "curbless" in solution_hits or "shower conversion" in solution_hits:
         action_parts.append("a curbless walk-in shower floor integrated directly into the existing bathroom floor, with the shower floor properly sloped toward a linear drain, seamlessly connecting to the surrounding bathroom floor with no threshold or step")
     
     # Handle threshold ramps (portable) - specific positioning
-    if "threshold ramp" in solution_lower or "portable ramp" in solution_lower:
+    if "threshold ramp" in solution_hits or "portable ramp" in solution_hits:
         action_parts.append("a threshold ramp positioned directly at the step transition, with the ramp's bottom edge flush against the lower surface and top edge flush against the upper surface, connecting both surfaces with proper contact and support on both sides")
     
     # Handle lever handles - specific replacement
-    if "lever" in solution_lower and "handle" in solution_lower:
+    if "lever" in solution_hits and "handle" in solution_hits:
         action_parts.append("lever-style door handles installed directly on the existing door, replacing round knobs, with the handles properly mounted to the door surface using existing door hardware mounting points")
     
     # Handle bench seats - specific mounting
-    if "bench" in solution_lower or "seat" in solution_lower:
-        if "fold" in solution_lower or "fold-down" in solution_lower:
+    if "bench" in solution_hits or "seat" in solution_hits:
+        if "fold" in solution_hits or "fold-down" in solution_hits:
             action_parts.append("a fold-down bench seat mounted directly to the wall studs with visible wall brackets, properly secured at 18 inches height, with the bench flush against the wall when folded and properly supported when extended")
         else:
             action_parts.append("a bench seat mounted directly to the wall or floor, properly secured with visible structural supports, with the bench integrated into the existing space")
     
     # Handle toilet modifications
-    if "toilet" in solution_lower and ("riser" in solution_lower or "higher" in solution_lower):
+    if "toilet" in solution_hits and ("riser" in solution_hits or "higher" in solution_hits):
         action_parts.append("a toilet riser installed directly on the existing toilet base, properly secured and integrated with the toilet fixture, maintaining proper connection to the floor and plumbing")
     
     # Handle sink modifications
-    if "sink" in solution_lower and ("height" in solution_lower or "adjust" in solution_lower):
+    if "sink" in solution_hits and ("height" in solution_hits or "adjust" in solution_hits):
         action_parts.append("sink height adjustment integrated into the existing sink installation, with the sink properly mounted and connected to existing plumbing and wall supports")
     
     # Handle signage - specific mounting
-    if "sign" in solution_lower or "signage" in solution_lower:
+    if "sign" in solution_hits or "signage" in solution_hits:
         action_parts.append("accessibility signage mounted directly to the wall surface with visible wall anchors, properly secured at appropriate height, with the signage flush against the wall")
     
     # Handle non-slip mats
-    if "mat" in solution_lower and "non-slip" in solution_lower:
+    if "mat" in solution_hits and "non-slip" in solution_hits:
         action_parts.append("non-slip mats placed directly on the existing floor surface, with the mats properly positioned and in contact with the floor, showing proper surface contact")
     
     # Default integration if no specific action detected - still use connection verbs
     if not action_parts:
         # Generic integration based on solution - always specify connections
-        if "add" in solution_lower or "install" in solution_lower:
-            action_parts.append(f"the proposed solution integrated directly into the existing structure, with all components properly connected, secured, and supported by existing structural elements")
-        elif "remove" in solution_lower or "replace" in solution_lower:
-            action_parts.append(f"the renovation integrated seamlessly with the existing architecture, with all new elements properly connected to existing structural supports, maintaining structural continuity")
+        if "add" in solution_hits or "install" in solution_hits:
+            action_parts.append("the proposed solution integrated directly into the existing structure, with all components properly connected, secured, and supported by existing structural elements")
+        elif "remove" in solution_hits or "replace" in solution_hits:
+            action_parts.append("the renovation integrated seamlessly with the existing architecture, with all new elements properly connected to existing structural supports, maintaining structural continuity")
         else:
-            action_parts.append(f"the renovation integrated directly into the existing structure, with all modifications properly connected, secured, and supported by existing architectural elements")
+            action_parts.append("the renovation integrated directly into the existing structure, with all modifications properly connected, secured, and supported by existing architectural elements")
     
     return ", ".join(action_parts)
 
 
-def generate_structured_architectural_prompt(
-    identified_problem: str,
-    proposed_solution: str,
-    mask_prompt: str = "",
-    is_structural: bool = False,
-    clear_mask: str = "",
-    clear_prompt: str = "",
-    build_mask: str = "",
-    build_prompt: str = "",
-    wheelchair_accessible: bool = False
-) -> tuple[str, str]:
-    """
-    Generates a structured architectural in-painting prompt following the four-component format.
-    
-    This function constructs prompts using:
-    1. The Anchor (Context): Describes existing house material, lighting, and angle
-    2. The Integration (Action): Uses strong connection verbs for proper physical connections
-    3. The Style Enforcers: Keywords for realism and quality
-    4. The Negative Prompt: Hardcoded to prevent physics hallucinations
-    
-    Args:
-        identified_problem: The identified accessibility barrier/problem (e.g., from barrier_detected)
-        proposed_solution: The proposed renovation solution (e.g., from renovation_suggestion)
-        mask_prompt: Description of the area to modify
-        is_structural: Whether this is a structural renovation requiring removal
-        clear_mask: For structural: description of object to be removed
-        clear_prompt: For structural: what should replace the removed object
-        build_mask: For structural: wider area description for construction
-        build_prompt: For structural: detailed prompt for new accessible features
-        wheelchair_accessible: If True, focus on wheelchair-accessible modifications
-        
-    Returns:
-        A tuple of (main_prompt, negative_prompt) where:
-        - main_prompt: The complete structured prompt combining all components
-        - negative_prompt: The hardcoded negative prompt
-    """
-    # Use build_mask and build_prompt if provided (more specific), otherwise use mask_prompt and proposed_solution
-    effective_mask = build_mask if (is_structural and build_mask) else mask_prompt
-    effective_solution = build_prompt if (is_structural and build_prompt) else proposed_solution
-    
-    # Check if this is a case where no modification is needed
-    problem_lower = identified_problem.lower()
-    solution_lower = effective_solution.lower()
-    if "no barriers" in problem_lower or "no accessibility barriers" in problem_lower or "already accessible" in problem_lower:
-        # Return a prompt that explicitly says not to modify
-        main_prompt = f"""This room has been assessed and NO accessibility barriers were detected. 
+# Audit wording that means no barriers were found (matched case-insensitively)
+_NO_MODIFICATION_RE = re.compile(r"no (accessibility )?barriers|already accessible", re.IGNORECASE)
+
+# Prompt returned when the audit found no barriers (nothing to modify)
+_NO_MODIFICATION_PROMPT = sys.intern("""This room has been assessed and NO accessibility barriers were detected. 
 The room is already accessible and compliant. 
 DO NOT modify this image in any way. 
 Return the image exactly as it is, unchanged.
 DO NOT create new walls, partitions, or any structural elements.
 DO NOT add any new features.
-Preserve the image exactly as provided."""
-        return main_prompt, NEGATIVE_PROMPT
-    
-    # Component 1: The Anchor (Context)
-    anchor = _extract_anchor_context(identified_problem, effective_solution, effective_mask)
-    
-    # Component 2: The Integration (Action)
-    integration = _construct_integration_action(identified_problem, effective_solution, effective_mask)
-    
-    # Component 3: The Style Enforcers (already defined as constant)
-    style_enforcers = STYLE_ENFORCERS
-    
-    # For structural renovations, add removal context
-    removal_context = ""
-    if is_structural and clear_mask and clear_prompt:
-        removal_context = f"First, remove {clear_mask} and replace with {clear_prompt}, seamlessly blending with surrounding materials. Then, "
-    
-    # Construct the main prompt
-    main_prompt = f"""You are an expert architectural in-painting specialist performing a precise accessibility renovation.
+Preserve the image exactly as provided.""")
+
+# Main in-painting prompt, built once at import with the constant style enforcers and
+# negative prompt baked in; only the per-request fields are left as format placeholders
+_MAIN_PROMPT_TEMPLATE = f"""You are an expert architectural in-painting specialist performing a precise accessibility renovation.
 
 CRITICAL: ROOM ASSESSMENT FIRST
 Before making any changes, assess if this room actually needs modification:
@@ -442,10 +593,10 @@ Before making any changes, assess if this room actually needs modification:
 - DO NOT modify rooms that are already compliant with accessibility standards
 
 ANCHOR (CONTEXT):
-The existing structure features: {anchor}. Analyze the current materials, lighting conditions, and viewing perspective to ensure perfect integration. Match the existing material textures, colors, and finishes exactly.
+The existing structure features: {{anchor}}. Analyze the current materials, lighting conditions, and viewing perspective to ensure perfect integration. Match the existing material textures, colors, and finishes exactly.
 
 INTEGRATION (ACTION):
-{removal_context}{integration}. Ensure all connections are physically sound and visible:
+{{removal_context}}{{integration}}. Ensure all connections are physically sound and visible:
 - Ramps must connect to BOTH surfaces with proper foundation - bottom edge flush against lower surface, top edge flush against upper surface
 - Grab bars must be wall-mounted with visible anchors - flush against wall surface, properly secured to wall studs
 - Handrails must be attached to walls or posts with visible brackets - properly supported, allowing free passage
@@ -453,7 +604,7 @@ INTEGRATION (ACTION):
 - NO floating structures - everything must have visible connection points and support
 
 STYLE ENFORCERS:
-{style_enforcers}. The renovation must appear as if it was part of the original construction, with matching materials, textures, colors, and finishes. All new elements must blend seamlessly with existing architecture.
+{STYLE_ENFORCERS}. The renovation must appear as if it was part of the original construction, with matching materials, textures, colors, and finishes. All new elements must blend seamlessly with existing architecture.
 
 NEGATIVE PROMPT (ABSOLUTELY FORBIDDEN - DO NOT CREATE):
 DO NOT generate under ANY circumstances: {NEGATIVE_PROMPT}. 
@@ -466,7 +617,7 @@ CRITICAL PROHIBITIONS:
 - If you are unsure, DO NOT add anything - preserve the existing structure exactly as it is
 
 SPATIAL CONSTRAINTS (CRITICAL):
-- Analyze the exact location: {effective_mask if effective_mask else "the area described in the renovation solution"}
+- Analyze the exact location: {{location}}
 - Identify all adjacent elements: driveways, pathways, doors, walls, furniture - these MUST remain unobstructed
 - Verify the solution fits within available space without blocking access points
 - Ensure ramps have clear space extending 36 inches beyond ends and do NOT block driveways or pathways
@@ -499,14 +650,142 @@ GENERATION REQUIREMENTS:
 - Display visible connection points: wall anchors for grab bars, foundation for ramps, brackets for handrails
 - Ensure all surfaces connect properly: ramps must touch both surfaces, grab bars must touch walls, handrails must touch supports
 - If uncertain about whether to modify, DO NOT modify - preserve the original"""
+
+
+# Pure function of its (hashable) string arguments, and the same barrier tends to come
+# back many times in a session, so identical inputs reuse the built prompt
+@functools.lru_cache(maxsize=2048)
+def _build_architectural_prompt(
+    identified_problem: str,
+    proposed_solution: str,
+    mask_prompt: str,
+    removal_context: str = ""
+) -> tuple[str, str]:
+    """
+    Builds the structured in-painting prompt from already-resolved inputs.
+    
+    Args:
+        identified_problem: The identified accessibility barrier/problem
+        proposed_solution: The renovation to visualize (build_prompt for structural renovations)
+        mask_prompt: Description of the area to modify (build_mask for structural renovations), or ""
+        removal_context: Removal sentence prefixed to the integration, or "" for non-structural
+        
+    Returns:
+        A tuple of (main_prompt, negative_prompt)
+    """
+    # Check if this is a case where no modification is needed, before any lowercasing
+    if _NO_MODIFICATION_RE.search(identified_problem):
+        # Return a prompt that explicitly says not to modify
+        return _NO_MODIFICATION_PROMPT, NEGATIVE_PROMPT
+    
+    # Lowercase once here; the anchor and integration helpers work on the lowered text
+    problem_lower = identified_problem.lower()
+    solution_lower = proposed_solution.lower()
+    mask_lower = mask_prompt.lower()
+    
+    # Component 1: The Anchor (Context)
+    anchor = _extract_anchor_context(problem_lower, solution_lower, mask_lower)
+    
+    # Component 2: The Integration (Action)
+    integration = _construct_integration_action(problem_lower, solution_lower, mask_lower)
+    
+    # Component 3: The Style Enforcers are baked into _MAIN_PROMPT_TEMPLATE
+    
+    # Construct the main prompt
+    main_prompt = _MAIN_PROMPT_TEMPLATE.format(
+        anchor=anchor,
+        removal_context=removal_context,
+        integration=integration,
+        location=mask_prompt if mask_prompt else "the area described in the renovation solution"
+    )
     
     # Component 4: The Negative Prompt (hardcoded)
     negative_prompt = NEGATIVE_PROMPT
     
-    return main_prompt, negative_prompt
+    # Interned so identical prompts built from different inputs share one string object
+    return sys.intern(main_prompt), negative_prompt
 
 
-def get_structural_renovation_prompt(clear_mask: str, clear_prompt: str, build_mask: str, build_prompt: str, wheelchair_accessible: bool = False) -> str:
+def _removal_context(clear_mask: str, clear_prompt: str) -> str:
+    """Returns the removal sentence for structural renovations, or "" if either part is missing."""
+    if clear_mask and clear_prompt:
+        return f"First, remove {clear_mask} and replace with {clear_prompt}, seamlessly blending with surrounding materials. Then, "
+    return ""
+
+
+def generate_structured_architectural_prompt(
+    identified_problem: str,
+    proposed_solution: str,
+    mask_prompt: str = "",
+    is_structural: bool = False,
+    clear_mask: str = "",
+    clear_prompt: str = "",
+    build_mask: str = "",
+    build_prompt: str = "",
+    wheelchair_accessible: bool = False
+) -> tuple[str, str]:
+    """
+    Generates a structured architectural in-painting prompt following the four-component format.
+    
+    This function constructs prompts using:
+    1. The Anchor (Context): Describes existing house material, lighting, and angle
+    2. The Integration (Action): Uses strong connection verbs for proper physical connections
+    3. The Style Enforcers: Keywords for realism and quality
+    4. The Negative Prompt: Hardcoded to prevent physics hallucinations
+    
+    Args:
+        identified_problem: The identified accessibility barrier/problem (e.g., from barrier_detected)
+        proposed_solution: The proposed renovation solution (e.g., from renovation_suggestion)
+        mask_prompt: Description of the area to modify
+        is_structural: Whether this is a structural renovation requiring removal
+        clear_mask: For structural: description of object to be removed
+        clear_prompt: For structural: what should replace the removed object
+        build_mask: For structural: wider area description for construction
+        build_prompt: For structural: detailed prompt for new accessible features
+        wheelchair_accessible: If True, focus on wheelchair-accessible modifications
+        
+    Returns:
+        A tuple of (main_prompt, negative_prompt) where:
+        - main_prompt: The complete structured prompt combining all components
+        - negative_prompt: The hardcoded negative prompt
+    """
+    # Normalize once so the builder can lowercase unconditionally and the cache keys
+    # never differ between None and ""
+    identified_problem = identified_problem or ""
+    proposed_solution = proposed_solution or ""
+    mask_prompt = mask_prompt or ""
+    
+    if not is_structural:
+        return _build_architectural_prompt(identified_problem, proposed_solution, mask_prompt)
+    
+    # Use build_mask and build_prompt if provided (more specific), otherwise use mask_prompt and proposed_solution
+    return _build_architectural_prompt(
+        identified_problem,
+        build_prompt or proposed_solution,
+        build_mask or mask_prompt,
+        _removal_context(clear_mask, clear_prompt)
+    )
+
+
+def generate_prompts_batch(inputs: list[tuple]) -> list[tuple[str, str]]:
+    """
+    Generates prompts for many rooms at once, building each distinct input only once.
+    
+    Args:
+        inputs: Argument tuples for generate_structured_architectural_prompt, in its
+            positional order (identified_problem, proposed_solution, mask_prompt, ...)
+        
+    Returns:
+        A list of (main_prompt, negative_prompt) tuples, one per input, in input order
+    """
+    # Dict keys dedupe while keeping first-seen order
+    unique = dict.fromkeys(inputs)
+    for args in unique:
+        unique[args] = generate_structured_architectural_prompt(*args)
+    return [unique[args] for args in inputs]
+
+
+def get_structural_renovation_prompt(clear_mask: str, clear_prompt: str, build_mask: str, build_prompt: str, wheelchair_accessible: bool = False) -> tuple[str, str]:
     """
     Returns the reasoning prompt for structural renovations requiring removal.
     Uses the new Structured Architectural In-painting format.
@@ -519,28 +798,18 @@ def get_structural_renovation_prompt(clear_mask: str, clear_prompt: str, build_m
         wheelchair_accessible: If True, focus on wheelchair-accessible modifications
         
     Returns:
-        The formatted reasoning prompt for structural renovations
+        A tuple of (reasoning_prompt, negative_prompt) for structural renovations
     """
-    # Extract problem and solution from the prompts
-    identified_problem = clear_mask  # The barrier being removed
-    proposed_solution = build_prompt  # The new accessible feature
-    
-    main_prompt, _ = generate_structured_architectural_prompt(
-        identified_problem=identified_problem,
-        proposed_solution=proposed_solution,
-        mask_prompt=build_mask,
-        is_structural=True,
-        clear_mask=clear_mask,
-        clear_prompt=clear_prompt,
-        build_mask=build_mask,
-        build_prompt=build_prompt,
-        wheelchair_accessible=wheelchair_accessible
+    # The barrier being removed is the problem; the new accessible feature is the solution
+    return _build_architectural_prompt(
+        clear_mask or "",
+        build_prompt or "",
+        build_mask or "",
+        _removal_context(clear_mask, clear_prompt)
     )
-    
-    return main_prompt
 
 
-def get_non_structural_renovation_prompt(mask_prompt: str, prompt: str, wheelchair_accessible: bool = False) -> str:
+def get_non_structural_renovation_prompt(mask_prompt: str, prompt: str, wheelchair_accessible: bool = False) -> tuple[str, str]:
     """
     Returns the reasoning prompt for non-structural renovations (direct modifications).
     Uses the new Structured Architectural In-painting format.
@@ -551,20 +820,8 @@ def get_non_structural_renovation_prompt(mask_prompt: str, prompt: str, wheelcha
         wheelchair_accessible: If True, focus on wheelchair-accessible modifications
         
     Returns:
-        The formatted reasoning prompt for non-structural renovations
+        A tuple of (reasoning_prompt, negative_prompt) for non-structural renovations
     """
-    # Extract problem and solution from the prompts
     # For non-structural, we infer the problem from the area description
-    identified_problem = mask_prompt  # The area needing modification
-    proposed_solution = prompt  # The accessibility improvement
-    
-    main_prompt, _ = generate_structured_architectural_prompt(
-        identified_problem=identified_problem,
-        proposed_solution=proposed_solution,
-        mask_prompt=mask_prompt,
-        is_structural=False,
-        wheelchair_accessible=wheelchair_accessible
-    )
-    
-    return main_prompt
-
+    mask_prompt = mask_prompt or ""
+    return _build_architectural_prompt(mask_prompt, prompt or "", mask_prompt)
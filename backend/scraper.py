@@ -3,18 +3,74 @@ Realtor.ca Scraper for DeltaHacks AccessiVision Project
 Extracts property photos and metadata from Realtor.ca listings
 """
 
-from playwright.sync_api import sync_playwright
-import json
+from playwright.async_api import async_playwright, Browser, BrowserContext, Playwright, TimeoutError as PlaywrightTimeoutError
+import asyncio
+import atexit
+import orjson
+import os
 import re
-import random
+import tempfile
+import threading
 import time
 from typing import Dict, List, Optional
 
+# Browser launch flags and context settings shared by every scrape
+# NOTE: headless=False is more reliable for bypassing bot detection
+# Set headless=True only after confirming it works in your environment
+BROWSER_LAUNCH_OPTIONS = {
+    "headless": False,  # Non-headless to avoid bot detection
+    "args": [
+        '--disable-blink-features=AutomationControlled',
+        '--disable-dev-shm-usage',
+        '--disable-web-security',
+        '--disable-features=IsolateOrigins,site-per-process',
+    ],
+}
+BROWSER_CONTEXT_OPTIONS = {
+    "viewport": {'width': 1920, 'height': 1080},
+    "user_agent": 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    "locale": 'en-CA',
+    "timezone_id": 'America/Toronto',
+}
+
+# Listings scraped at once by scrape_realtor_ca_listings (pages share one browser)
+DEFAULT_MAX_CONCURRENCY = 3
+
+# Upper bound on each "page has settled" wait (network idle, lazy images loaded)
+SETTLE_TIMEOUT_MS = 5000
+
+# Listing fields pulled out of the page text / description, compiled once at import
+_PRICE_RE = re.compile(r'\$[\d,]+')
+_BED_RE = re.compile(r'(\d+)\s*(?:\+)?\s*Bed(?:room)?s?', re.IGNORECASE)
+_BATH_RE = re.compile(r'(\d+)\s*Bath(?:room)?s?', re.IGNORECASE)
+_SQFT_RE = re.compile(r'([\d,]+)\s*(?:sq\.?\s*ft|Square Feet)', re.IGNORECASE)
+_MLS_RE = re.compile(r'MLS[®#\s]*:?\s*([A-Z0-9]+)')
+_NEIGHBORHOOD_RE = re.compile(
+    r'(?:in|of) (?:the )?(.+?) (?:Community|Neighbourhood|Neighborhood)',
+    re.IGNORECASE
+)
+_LOCATION_RE = re.compile(r'Location Description\s*\n\s*(.+)', re.IGNORECASE)
+_COMMUNITY_RE = re.compile(r'Community Features\s*\n\s*(.+)', re.IGNORECASE)
+_SCHOOL_BUS_RE = re.compile(r'School Bus', re.IGNORECASE)
+
+# (amenity, pattern) pairs searched in the description, in output order
+_PROXIMITY = [
+    ('highway', re.compile(r'(?:minutes|min|mins) from Highway (\d+)', re.IGNORECASE)),
+    ('downtown', re.compile(r'(?:minutes|min|mins) (?:from|to) (?:downtown|city)', re.IGNORECASE)),
+    ('schools', re.compile(r'(?:near|close to|walking distance to) schools', re.IGNORECASE)),
+    ('shopping', re.compile(r'(?:near|close to) shopping', re.IGNORECASE)),
+    ('parks', re.compile(r'(?:near|close to) parks', re.IGNORECASE)),
+    ('transit', re.compile(r'(?:near|close to) (?:transit|TTC|GO Train)', re.IGNORECASE)),
+]
+
 
 def scrape_realtor_ca_listing(listing_url: str) -> Dict:
     """
     Scrape complete listing data from Realtor.ca with anti-bot bypass.
 
+    Synchronous wrapper around scrape_realtor_ca_listings for a single URL;
+    call it from a worker thread, not from a running event loop.
+
     Args:
         listing_url: Full URL to a Realtor.ca listing
 
@@ -25,214 +81,382 @@ def scrape_realtor_ca_listing(listing_url: str) -> Dict:
         - neighborhood: name, location, amenities, community features
         - description: Full property description
     """
-    with sync_playwright() as p:
-        # Launch browser with anti-detection flags
-        # NOTE: headless=False is more reliable for bypassing bot detection
-        # Set headless=True only after confirming it works in your environment
-        browser = p.chromium.launch(
-            headless=False,  # Non-headless to avoid bot detection
-            args=[
-                '--disable-blink-features=AutomationControlled',
-                '--disable-dev-shm-usage',
-                '--disable-web-security',
-                '--disable-features=IsolateOrigins,site-per-process',
-            ]
-        )
+    future = asyncio.run_coroutine_threadsafe(_scrape_batch([listing_url], DEFAULT_MAX_CONCURRENCY), _get_scraper_loop())
+    return future.result()[0]
 
-        # Create context with realistic settings
-        context = browser.new_context(
-            viewport={'width': 1920, 'height': 1080},
-            user_agent='Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            locale='en-CA',
-            timezone_id='America/Toronto',
-        )
 
-        page = context.new_page()
+async def scrape_realtor_ca_listings(listing_urls: List[str], max_concurrency: int = DEFAULT_MAX_CONCURRENCY) -> List[Dict]:
+    """
+    Scrape several Realtor.ca listings in parallel, sharing one browser and context.
+
+    Can be awaited from any event loop; the work runs on the scraper's own loop,
+    which owns the shared browser.
+
+    Args:
+        listing_urls: Full URLs to Realtor.ca listings
+        max_concurrency: Maximum number of listing pages open at once
+
+    Returns:
+        One listing dictionary per URL, in input order (see scrape_realtor_ca_listing)
+    """
+    future = asyncio.run_coroutine_threadsafe(_scrape_batch(listing_urls, max_concurrency), _get_scraper_loop())
+    return await asyncio.wrap_future(future)
+
+
+async def _scrape_batch(listing_urls: List[str], max_concurrency: int) -> List[Dict]:
+    """Scrapes listings on the scraper loop, at most max_concurrency pages at a time."""
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def scrape_with_slot(listing_url: str) -> Dict:
+        async with semaphore:
+            context = await _acquire_context()
+            try:
+                return await _scrape_listing_page(context, listing_url)
+            finally:
+                await _release_context(context)
+
+    return await asyncio.gather(*(scrape_with_slot(url) for url in listing_urls))
+
+
+# ============================================================================
+# SHARED BROWSER
+# ============================================================================
+# Chromium is started on first use and kept for the life of the process, so only
+# the first listing pays the browser cold start. Playwright objects belong to the
+# event loop that created them, so they live on one long-running loop in a daemon
+# thread and every scrape is submitted to it.
+
+# Pages served by one context before it is replaced (sheds accumulated cookies/cache)
+CONTEXT_MAX_PAGES = 20
+
+# Cookies and localStorage saved after a listing loads (i.e. past any robot check),
+# so new contexts and restarts usually skip the CAPTCHA. Discarded after a month.
+STORAGE_STATE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "realtor_state.json")
+STORAGE_STATE_MAX_AGE_SECONDS = 30 * 24 * 60 * 60
+
+_scraper_loop: Optional[asyncio.AbstractEventLoop] = None
+_scraper_loop_lock = threading.Lock()
+
+_playwright: Optional[Playwright] = None
+_browser: Optional[Browser] = None
+_context: Optional[BrowserContext] = None
+_context_pages = 0
+_browser_lock: Optional[asyncio.Lock] = None
+
+
+def _get_scraper_loop() -> asyncio.AbstractEventLoop:
+    """Returns the scraper's event loop, starting its thread on first use."""
+    global _scraper_loop
+    with _scraper_loop_lock:
+        if _scraper_loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="scraper-loop", daemon=True).start()
+            _scraper_loop = loop
+        return _scraper_loop
+
+
+async def _acquire_context() -> BrowserContext:
+    """Returns the shared context, launching the browser or rotating the context as needed."""
+    global _playwright, _browser, _context, _context_pages, _browser_lock
+    if _browser_lock is None:
+        _browser_lock = asyncio.Lock()
+    async with _browser_lock:
+        if _browser is None or not _browser.is_connected():
+            if _playwright is None:
+                _playwright = await async_playwright().start()
+            # Launch browser with anti-detection flags
+            _browser = await _playwright.chromium.launch(**BROWSER_LAUNCH_OPTIONS)
+            _context = None
+        if _context is None or _context_pages >= CONTEXT_MAX_PAGES:
+            retired = _context
+            # Create context with realistic settings
+            _context = await _new_context(_browser)
+            _context_pages = 0
+            # A retired context with no pages left is closed now; one still serving
+            # pages is closed by _release_context once its last page is done
+            if retired is not None:
+                await _release_context(retired)
+        _context_pages += 1
+        return _context
+
+
+def _load_storage_state() -> Optional[str]:
+    """Returns the saved storage state path, or None if there is none or it is too old."""
+    try:
+        age = time.time() - os.path.getmtime(STORAGE_STATE_PATH)
+    except OSError:
+        return None
+    if age > STORAGE_STATE_MAX_AGE_SECONDS:
+        try:
+            os.remove(STORAGE_STATE_PATH)
+        except OSError:
+            pass
+        return None
+    return STORAGE_STATE_PATH
+
 
+async def _new_context(browser: Browser) -> BrowserContext:
+    """Creates a context with the saved storage state, discarding the state if it is unusable."""
+    storage_state = _load_storage_state()
+    if storage_state is not None:
         try:
-            # Navigate to the page
-            print("Opening browser and navigating to listing...")
-            page.goto(listing_url, wait_until="domcontentloaded", timeout=30000)
-
-            # Wait for initial page load
-            time.sleep(2)
-
-            # Check if robot verification is present
-            print("\n" + "="*70)
-            print("PLEASE COMPLETE HUMAN VERIFICATION IF PROMPTED")
-            print("="*70)
-            print("A browser window has opened. If you see a robot check or CAPTCHA:")
-            print("  1. Complete the verification in the browser window")
-            print("  2. Wait for the listing page to load")
-            print("  3. The scraper will automatically continue")
-            print("\nWaiting up to 60 seconds for page to be ready...")
-            print("="*70 + "\n")
-
-            # Wait for user to complete robot check (if present)
-            # We'll check for common Realtor.ca elements that indicate the page loaded
+            return await browser.new_context(**BROWSER_CONTEXT_OPTIONS, storage_state=storage_state)
+        except Exception as e:
+            print(f"Discarding unreadable browser storage state: {str(e)}")
             try:
-                # Wait for either the image gallery or property details to appear
-                # This gives user time to complete any CAPTCHA
-                page.wait_for_selector('img[src*="cdn.realtor.ca"], .propertyDetails, [class*="photo"], [class*="image"]',
-                                      timeout=60000)
-                print("✓ Page loaded successfully!\n")
-            except:
-                print("⚠ Timeout waiting for page elements. Continuing anyway...\n")
-
-            # Additional wait after page loads to ensure lazy images are ready
-            time.sleep(random.uniform(2, 3))
-
-            # Scroll to load lazy images
-            page.evaluate("""
-                async () => {
-                    await new Promise((resolve) => {
-                        let totalHeight = 0;
-                        let distance = 100;
-                        let timer = setInterval(() => {
-                            let scrollHeight = document.body.scrollHeight;
-                            window.scrollBy(0, distance);
-                            totalHeight += distance;
-                            if(totalHeight >= scrollHeight){
-                                clearInterval(timer);
-                                resolve();
-                            }
-                        }, 100);
-                    });
-                }
-            """)
-
-            time.sleep(1)
-            page.evaluate("window.scrollTo(0, 0)")
-
-            listing_data = {
-                "url": listing_url,
-                "property_photos": [],
-                "basic_info": {},
-                "neighborhood": {
-                    "name": "",
-                    "location_description": "",
-                    "amenities": [],
-                    "community_features": []
-                },
-                "description": ""
-            }
+                os.remove(STORAGE_STATE_PATH)
+            except OSError:
+                pass
+    return await browser.new_context(**BROWSER_CONTEXT_OPTIONS)
 
-            # ========== EXTRACT PROPERTY PHOTOS ==========
-            images = page.query_selector_all('img')
-            for img in images:
-                src = img.get_attribute('src')
-                if src and 'cdn.realtor.ca/listing' in src and '/highres/' in src:
-                    if src not in listing_data["property_photos"]:
-                        listing_data["property_photos"].append(src)
-
-            # ========== EXTRACT PAGE TEXT ==========
-            page_text = page.inner_text('body')
-
-            # ========== EXTRACT STRUCTURED DATA ==========
-            json_ld_scripts = page.query_selector_all('script[type="application/ld+json"]')
-            for script in json_ld_scripts:
-                try:
-                    data = json.loads(script.inner_text())
-                    if isinstance(data, dict) and data.get('@type') == 'Product':
-                        if 'name' in data:
-                            listing_data["basic_info"]["address"] = data['name']
-                        if 'description' in data:
-                            listing_data["description"] = data['description']
-                        if 'offers' in data:
-                            offers = data['offers']
-                            if isinstance(offers, list):
-                                offers = offers[0]
-                            if 'price' in offers:
-                                listing_data["basic_info"]["price"] = "$" + str(offers['price'])
-                except:
-                    pass
-
-            # ========== EXTRACT FROM TEXT ==========
-            # Price
-            if "price" not in listing_data["basic_info"]:
-                price_match = re.search(r'\$[\d,]+', page_text)
-                if price_match:
-                    listing_data["basic_info"]["price"] = price_match.group()
-
-            # Bedrooms
-            bed_match = re.search(r'(\d+)\s*(?:\+)?\s*Bed(?:room)?s?', page_text, re.IGNORECASE)
-            if bed_match:
-                listing_data["basic_info"]["bedrooms"] = bed_match.group(1)
-
-            # Bathrooms
-            bath_match = re.search(r'(\d+)\s*Bath(?:room)?s?', page_text, re.IGNORECASE)
-            if bath_match:
-                listing_data["basic_info"]["bathrooms"] = bath_match.group(1)
-
-            # Square footage
-            sqft_match = re.search(r'([\d,]+)\s*(?:sq\.?\s*ft|Square Feet)', page_text, re.IGNORECASE)
-            if sqft_match:
-                listing_data["basic_info"]["square_feet"] = sqft_match.group(1) + " sq ft"
-
-            # MLS
-            mls_match = re.search(r'MLS[®#\s]*:?\s*([A-Z0-9]+)', page_text)
-            if mls_match:
-                listing_data["basic_info"]["mls_number"] = mls_match.group(1)
-
-            # ========== EXTRACT NEIGHBORHOOD INFO ==========
-            description = listing_data.get('description', '')
-
-            # Neighborhood name
-            neighborhood_match = re.search(
-                r'(?:in|of) (?:the )?(.+?) (?:Community|Neighbourhood|Neighborhood)',
-                description, re.IGNORECASE
-            )
-            if neighborhood_match:
-                listing_data["neighborhood"]["name"] = neighborhood_match.group(1).strip()
-
-            # Location description
-            location_match = re.search(r'Location Description\s*\n\s*(.+)', page_text, re.IGNORECASE)
-            if location_match:
-                listing_data["neighborhood"]["location_description"] = location_match.group(1).strip()
-
-            # Community features
-            community_match = re.search(r'Community Features\s*\n\s*(.+)', page_text, re.IGNORECASE)
-            if community_match:
-                features_text = community_match.group(1).strip()
-                listing_data["neighborhood"]["community_features"] = [
-                    f.strip() for f in features_text.split(',')
-                ]
-
-            # Extract amenities
-            if description:
-                proximity_keywords = {
-                    'highway': r'(?:minutes|min|mins) from Highway (\d+)',
-                    'downtown': r'(?:minutes|min|mins) (?:from|to) (?:downtown|city)',
-                    'schools': r'(?:near|close to|walking distance to) schools',
-                    'shopping': r'(?:near|close to) shopping',
-                    'parks': r'(?:near|close to) parks',
-                    'transit': r'(?:near|close to) (?:transit|TTC|GO Train)',
-                }
 
-                for feature, pattern in proximity_keywords.items():
-                    match = re.search(pattern, description, re.IGNORECASE)
-                    if match:
-                        listing_data["neighborhood"]["amenities"].append(
-                            feature.title() + ": " + match.group(0)
-                        )
+async def _save_storage_state(context: BrowserContext) -> None:
+    """Saves the context's cookies and localStorage for future contexts.
+
+    Concurrent pages may save at the same time, so each writes its own temp file
+    and swaps it into place; readers only ever see a complete file.
+    """
+    try:
+        state = await context.storage_state()
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(STORAGE_STATE_PATH), prefix="realtor_state.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(orjson.dumps(state))
+            os.replace(tmp_path, STORAGE_STATE_PATH)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+    except Exception as e:
+        print(f"Could not save browser storage state: {str(e)}")
+
+
+async def _release_context(context: BrowserContext) -> None:
+    """Closes a retired context once no page is using it any more."""
+    if context is not _context and not context.pages:
+        try:
+            await context.close()
+        except Exception:
+            pass
 
-            # School bus
-            if re.search(r'School Bus', page_text, re.IGNORECASE):
-                listing_data["neighborhood"]["amenities"].append("School Bus Service Available")
 
-            return listing_data
+async def _close_browser() -> None:
+    """Closes the shared browser and stops Playwright."""
+    global _playwright, _browser, _context
+    if _browser is not None:
+        await _browser.close()
+    if _playwright is not None:
+        await _playwright.stop()
+    _playwright = _browser = _context = None
 
-        except Exception as e:
-            print(f"Error scraping listing: {str(e)}")
-            return {
-                "error": str(e),
-                "property_photos": [],
-                "basic_info": {},
-                "neighborhood": {},
-                "description": ""
+
+@atexit.register
+def _shutdown_browser() -> None:
+    """Closes the shared browser on interpreter exit (if one was started)."""
+    if _scraper_loop is None or _browser is None:
+        return
+    try:
+        asyncio.run_coroutine_threadsafe(_close_browser(), _scraper_loop).result(timeout=10)
+    except Exception as e:
+        print(f"Error closing scraper browser: {str(e)}")
+
+
+async def _scrape_listing_page(context: BrowserContext, listing_url: str) -> Dict:
+    """
+    Scrape one listing in a new page of the shared browser context.
+
+    Args:
+        context: Browser context shared by the batch
+        listing_url: Full URL to a Realtor.ca listing
+
+    Returns:
+        Listing dictionary, or a dictionary with an "error" key if scraping failed
+    """
+    page = await context.new_page()
+
+    try:
+        # Navigate to the page
+        print("Opening browser and navigating to listing...")
+        await page.goto(listing_url, wait_until="domcontentloaded", timeout=30000)
+
+        # Check if robot verification is present
+        print("\n" + "="*70)
+        print("PLEASE COMPLETE HUMAN VERIFICATION IF PROMPTED")
+        print("="*70)
+        print("A browser window has opened. If you see a robot check or CAPTCHA:")
+        print("  1. Complete the verification in the browser window")
+        print("  2. Wait for the listing page to load")
+        print("  3. The scraper will automatically continue")
+        print("\nWaiting up to 60 seconds for page to be ready...")
+        print("="*70 + "\n")
+
+        # Wait for user to complete robot check (if present)
+        # We'll check for common Realtor.ca elements that indicate the page loaded
+        try:
+            # Wait for either the image gallery or property details to appear
+            # This gives user time to complete any CAPTCHA
+            await page.wait_for_selector('img[src*="cdn.realtor.ca"], .propertyDetails, [class*="photo"], [class*="image"]',
+                                         timeout=60000)
+            print("✓ Page loaded successfully!\n")
+            await _save_storage_state(context)
+        except PlaywrightTimeoutError:
+            print("⚠ Timeout waiting for page elements. Continuing anyway...\n")
+
+        # Let the requests started by the page settle instead of sleeping a fixed time
+        try:
+            await page.wait_for_load_state("networkidle", timeout=SETTLE_TIMEOUT_MS)
+        except PlaywrightTimeoutError:
+            pass
+
+        # Scroll to load lazy images: one viewport per animation frame, so every part
+        # of the page intersects the viewport once without a fixed per-step delay
+        await page.evaluate("""
+            async () => {
+                while (window.scrollY + window.innerHeight < document.body.scrollHeight) {
+                    const previousY = window.scrollY;
+                    window.scrollBy(0, window.innerHeight);
+                    await new Promise(requestAnimationFrame);
+                    if (window.scrollY === previousY) break;  // page can't scroll further
+                }
             }
-        finally:
-            browser.close()
+        """)
+
+        # Wait until the images that scrolling triggered have finished loading
+        try:
+            await page.wait_for_function(
+                "Array.from(document.images).every(img => img.complete)",
+                timeout=SETTLE_TIMEOUT_MS
+            )
+        except PlaywrightTimeoutError:
+            pass
+
+        await page.evaluate("window.scrollTo(0, 0)")
+
+        listing_data = {
+            "url": listing_url,
+            "property_photos": [],
+            "basic_info": {},
+            "neighborhood": {
+                "name": "",
+                "location_description": "",
+                "amenities": [],
+                "community_features": []
+            },
+            "description": ""
+        }
+
+        # ========== EXTRACT PROPERTY PHOTOS ==========
+        # One round-trip for every src instead of a get_attribute call per <img>
+        image_srcs = await page.eval_on_selector_all('img', "els => els.map(e => e.getAttribute('src'))")
+        # Galleries repeat the same photo (thumbnails, carousel clones); keep first occurrences in order
+        seen_photos = set()
+        photos = []
+        for src in image_srcs:
+            if src and 'cdn.realtor.ca/listing' in src and '/highres/' in src:
+                if src not in seen_photos:
+                    seen_photos.add(src)
+                    photos.append(src)
+        listing_data["property_photos"] = photos
+
+        # ========== EXTRACT PAGE TEXT ==========
+        page_text = await page.inner_text('body')
+
+        # ========== EXTRACT STRUCTURED DATA ==========
+        json_ld_texts = await page.eval_on_selector_all(
+            'script[type="application/ld+json"]', "els => els.map(e => e.textContent)"
+        )
+        for json_ld_text in json_ld_texts:
+            try:
+                data = orjson.loads(json_ld_text)
+                if isinstance(data, dict) and data.get('@type') == 'Product':
+                    if 'name' in data:
+                        listing_data["basic_info"]["address"] = data['name']
+                    if 'description' in data:
+                        listing_data["description"] = data['description']
+                    if 'offers' in data:
+                        offers = data['offers']
+                        if isinstance(offers, list):
+                            offers = offers[0] if offers else {}
+                        if 'price' in offers:
+                            listing_data["basic_info"]["price"] = "$" + str(offers['price'])
+                    # The listing's Product blob has everything we need; skip the rest
+                    break
+            except (orjson.JSONDecodeError, TypeError, KeyError):
+                pass
+
+        # ========== EXTRACT FROM TEXT ==========
+        # Price
+        if "price" not in listing_data["basic_info"]:
+            price_match = _PRICE_RE.search(page_text)
+            if price_match:
+                listing_data["basic_info"]["price"] = price_match.group()
+
+        # Bedrooms
+        bed_match = _BED_RE.search(page_text)
+        if bed_match:
+            listing_data["basic_info"]["bedrooms"] = bed_match.group(1)
+
+        # Bathrooms
+        bath_match = _BATH_RE.search(page_text)
+        if bath_match:
+            listing_data["basic_info"]["bathrooms"] = bath_match.group(1)
+
+        # Square footage
+        sqft_match = _SQFT_RE.search(page_text)
+        if sqft_match:
+            listing_data["basic_info"]["square_feet"] = sqft_match.group(1) + " sq ft"
+
+        # MLS
+        mls_match = _MLS_RE.search(page_text)
+        if mls_match:
+            listing_data["basic_info"]["mls_number"] = mls_match.group(1)
+
+        # ========== EXTRACT NEIGHBORHOOD INFO ==========
+        description = listing_data.get('description', '')
+
+        # Neighborhood name
+        neighborhood_match = _NEIGHBORHOOD_RE.search(description)
+        if neighborhood_match:
+            listing_data["neighborhood"]["name"] = neighborhood_match.group(1).strip()
+
+        # Location description
+        location_match = _LOCATION_RE.search(page_text)
+        if location_match:
+            listing_data["neighborhood"]["location_description"] = location_match.group(1).strip()
+
+        # Community features
+        community_match = _COMMUNITY_RE.search(page_text)
+        if community_match:
+            features_text = community_match.group(1).strip()
+            listing_data["neighborhood"]["community_features"] = [
+                f.strip() for f in features_text.split(',')
+            ]
+
+        # Extract amenities
+        if description:
+            for feature, pattern in _PROXIMITY:
+                match = pattern.search(description)
+                if match:
+                    listing_data["neighborhood"]["amenities"].append(
+                        feature.title() + ": " + match.group(0)
+                    )
+
+        # School bus
+        if _SCHOOL_BUS_RE.search(page_text):
+            listing_data["neighborhood"]["amenities"].append("School Bus Service Available")
+
+        return listing_data
+
+    except Exception as e:
+        print(f"Error scraping listing: {str(e)}")
+        return {
+            "error": str(e),
+            "property_photos": [],
+            "basic_info": {},
+            "neighborhood": {},
+            "description": ""
+        }
+    finally:
+        await page.close()
 
 
 def get_property_images(listing_url: str) -> List[str]:
@@ -1,7 +1,17 @@
 import os
-import json
-import base64
+import bisect
+import functools
+import hashlib
+import logging
+import re
+from pydantic import ValidationError
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from cachetools import LRUCache
+import ahocorasick
 from io import BytesIO
 from typing import Dict, Optional, Any, Union
 from urllib.parse import urlparse
@@ -14,7 +24,11 @@ from google.genai import types as genai_types
 
 # Import prompts
 from prompts import (
-    get_audit_prompt,
+    AUDIT_PROMPT_VERSION,
+    parse_audit_response,
+    AuditResult,
+    get_audit_prompt_messages,
+    get_audit_batch_prompt_messages,
     get_structural_renovation_prompt,
     get_non_structural_renovation_prompt,
 )
@@ -25,6 +39,18 @@ load_dotenv()
 # Initialize Gemini Client (used for both text analysis and image generation)
 gemini_client = genai_client.Client(api_key=os.getenv("GEMINI_API_KEY"))
 
+# Shared HTTP session for image downloads (keep-alive connection pooling). Transient
+# connection errors and gateway errors are retried on the same pooled connections.
+http_retry = Retry(total=2, backoff_factor=0.3, status_forcelist=(502, 503, 504))
+http_session = requests.Session()
+http_session.mount("https://", HTTPAdapter(pool_connections=32, pool_maxsize=32, max_retries=http_retry))
+http_session.mount("http://", HTTPAdapter(pool_connections=32, pool_maxsize=32, max_retries=http_retry))
+
+# Threads for get_image_bytes_batch; downloads mostly wait on the network, and the
+# pool above keeps their connections alive between batches
+IMAGE_DOWNLOAD_WORKERS = 8
+image_download_executor = ThreadPoolExecutor(max_workers=IMAGE_DOWNLOAD_WORKERS, thread_name_prefix="image-download")
+
 # ============================================================================
 # CONFIGURATION CONSTANTS
 # ============================================================================
@@ -35,10 +61,83 @@ GEMINI_TEXT_MODEL = "gemini-3-flash-preview" # Flash-optimized for speed
 # Gemini Image Generation Configuration
 GEMINI_IMAGE_MODEL = "gemini-2.5-flash-image"
 GEMINI_IMAGE_TIMEOUT = 60  # Reduced for Flash-optimized speed
+# Inline parts smaller than this are not the generated image (e.g. thumbnails/metadata)
+GENERATED_IMAGE_MIN_BYTES = 10000
+
+# Child of main.py's "hearth" logger, so records go through its queued handler.
+# Debug records (prompts, response parts) are skipped unless HEARTH_DEBUG=1.
+logger = logging.getLogger("hearth.services")
+if os.getenv("HEARTH_DEBUG") == "1":
+    logger.setLevel(logging.DEBUG)
 
 # Image Processing Configuration
 MAX_IMAGE_SIZE_MB = 10
 MAX_IMAGE_SIZE_BYTES = MAX_IMAGE_SIZE_MB * 1024 * 1024
+# Downloads are read in chunks of this size so an oversized image is rejected
+# as soon as it passes MAX_IMAGE_SIZE_BYTES, not after it is fully buffered
+IMAGE_DOWNLOAD_CHUNK_BYTES = 64 * 1024
+
+# Photos sent to the audit model are downscaled and re-encoded first
+AUDIT_IMAGE_MAX_EDGE = 1024
+AUDIT_IMAGE_WEBP_QUALITY = 80
+# Photos already this small (and no larger than AUDIT_IMAGE_MAX_EDGE) are sent as-is
+AUDIT_PASSTHROUGH_MAX_BYTES = 512 * 1024
+AUDIT_PASSTHROUGH_FORMATS = frozenset({"JPEG", "PNG", "WEBP"})
+
+# Downloaded originals, keyed by URL, so the audit and the generation of the same
+# listing photo only fetch it once (bounded by total bytes)
+IMAGE_BYTES_CACHE_MAX_BYTES = 32 * 1024 * 1024
+image_bytes_cache: LRUCache = LRUCache(maxsize=IMAGE_BYTES_CACHE_MAX_BYTES, getsizeof=len)
+image_bytes_cache_lock = threading.Lock()
+# Downloads in progress, keyed by URL, so a prefetch and the audit that needs the
+# same photo share one request (guarded by image_bytes_cache_lock)
+image_bytes_inflight: dict[str, Future] = {}
+
+# Audit results keyed by the photo's perceptual hash (plus flag and prompt version),
+# so the same photo re-used across listings or URLs skips the Gemini call. A photo
+# whose hash is within AUDIT_HASH_MAX_DISTANCE bits of a cached one (re-compressed,
+# resized or lightly cropped copy) reuses that audit too.
+AUDIT_RESULT_CACHE_MAX_ENTRIES = 1024
+AUDIT_HASH_MAX_DISTANCE = 6
+audit_result_cache: LRUCache = LRUCache(maxsize=AUDIT_RESULT_CACHE_MAX_ENTRIES)
+
+# Exact tier in front of it, keyed by a digest of the downloaded bytes, so an
+# identical file skips the image decode and hashing entirely
+audit_digest_cache: LRUCache = LRUCache(maxsize=AUDIT_RESULT_CACHE_MAX_ENTRIES)
+audit_result_cache_lock = threading.Lock()
+
+# Audit request config per wheelchair_accessible flag, built once at import. The
+# system instruction is the large static audit prompt; pre-building it as a Content
+# skips re-validating and re-wrapping ~4KB of prompt text on every audit. The
+# response schema makes Gemini return exactly the AuditResult keys.
+AUDIT_CONFIGS = {
+    flag: genai_types.GenerateContentConfig(
+        system_instruction=genai_types.Content(
+            parts=[genai_types.Part(text=get_audit_prompt_messages(wheelchair_accessible=flag)[0])]
+        ),
+        response_modalities=["TEXT"],
+        response_mime_type="application/json",
+        response_schema=AuditResult
+    )
+    for flag in (False, True)
+}
+
+# Same prefix with a one-token output, used by warmup_audit_cache
+AUDIT_WARMUP_CONFIG = AUDIT_CONFIGS[False].model_copy(update={"max_output_tokens": 1})
+
+# Most photos audit_rooms sends in one Gemini request; larger batches are split so a
+# request stays well inside the model's context and output limits
+AUDIT_BATCH_MAX_IMAGES = 8
+
+# Threads audit_rooms uses to send its split requests to Gemini in parallel
+AUDIT_REQUEST_WORKERS = 4
+audit_request_executor = ThreadPoolExecutor(max_workers=AUDIT_REQUEST_WORKERS, thread_name_prefix="audit-request")
+
+# Same, for audit_rooms (one request, a JSON array with one result per photo)
+AUDIT_BATCH_CONFIGS = {
+    flag: AUDIT_CONFIGS[flag].model_copy(update={"response_schema": list[AuditResult]})
+    for flag in (False, True)
+}
 
 # ============================================================================
 # FEASIBILITY VALIDATION
@@ -49,6 +148,25 @@ FEASIBILITY_BLOCKLIST = [
     "home elevator", "residential elevator", "chair lift"
 ]
 
+# Blocklist matcher built once at import: one pass over the suggestion finds every blocked term
+_BLOCKLIST_AUTOMATON = ahocorasick.Automaton()
+for _term in FEASIBILITY_BLOCKLIST:
+    _BLOCKLIST_AUTOMATON.add_word(_term, _term)
+_BLOCKLIST_AUTOMATON.make_automaton()
+
+# Fence-like wording rewritten to open handrail terminology (case-sensitive, like
+# the replacements it stands for); detection itself is case-insensitive
+FENCE_TERM_REPLACEMENTS = {
+    "fence": "open handrail",
+    "Fence": "Open handrail",
+    "cage": "open safety rail",
+    "Cage": "Open safety rail",
+    "enclosure": "open handrail system",
+    "Enclosure": "Open handrail system",
+}
+_FENCE_TERM_RE = re.compile("|".join(FENCE_TERM_REPLACEMENTS))
+_FENCE_TERM_ANY_CASE_RE = re.compile(r"fence|cage|enclosure", re.IGNORECASE)
+
 # Fallback solution when blocked suggestions are detected
 FALLBACK_SOLUTION = {
     "renovation_suggestion": "Install grab bars and lever-style door handles for improved accessibility",
@@ -74,11 +192,12 @@ def validate_feasibility(audit_data: dict) -> dict:
     """
     suggestion = audit_data.get("renovation_suggestion", "").lower()
     
-    # Check for blocked terms
+    # Check for blocked terms (reported in blocklist order)
+    hits = {term for _, term in _BLOCKLIST_AUTOMATON.iter(suggestion)}
     for blocked_term in FEASIBILITY_BLOCKLIST:
-        if blocked_term in suggestion:
-            print(f"[FEASIBILITY] Blocked infeasible suggestion containing '{blocked_term}'")
-            print(f"[FEASIBILITY] Original suggestion: {audit_data.get('renovation_suggestion', '')}")
+        if blocked_term in hits:
+            logger.info("[FEASIBILITY] Blocked infeasible suggestion containing '%s'", blocked_term)
+            logger.info("[FEASIBILITY] Original suggestion: %s", audit_data.get('renovation_suggestion', ''))
             
             # Replace with fallback solution
             audit_data["renovation_suggestion"] = FALLBACK_SOLUTION["renovation_suggestion"]
@@ -92,7 +211,7 @@ def validate_feasibility(audit_data: dict) -> dict:
             audit_data["clear_prompt"] = ""
             audit_data["build_mask"] = audit_data.get("mask_prompt", "the accessible area")
             
-            print(f"[FEASIBILITY] Using fallback solution: {FALLBACK_SOLUTION['renovation_suggestion']}")
+            logger.info("[FEASIBILITY] Using fallback solution: %s", FALLBACK_SOLUTION['renovation_suggestion'])
             break
     
     # Ensure railings are described as open (not fences)
@@ -100,15 +219,10 @@ def validate_feasibility(audit_data: dict) -> dict:
         if key in audit_data and audit_data[key]:
             prompt = audit_data[key]
             # Replace fence-like terms with open handrail terminology
-            if "fence" in prompt.lower() or "cage" in prompt.lower() or "enclosure" in prompt.lower():
-                prompt = prompt.replace("fence", "open handrail")
-                prompt = prompt.replace("Fence", "Open handrail")
-                prompt = prompt.replace("cage", "open safety rail")
-                prompt = prompt.replace("Cage", "Open safety rail")
-                prompt = prompt.replace("enclosure", "open handrail system")
-                prompt = prompt.replace("Enclosure", "Open handrail system")
+            if _FENCE_TERM_ANY_CASE_RE.search(prompt):
+                prompt = _FENCE_TERM_RE.sub(lambda m: FENCE_TERM_REPLACEMENTS[m.group()], prompt)
                 audit_data[key] = prompt
-                print(f"[FEASIBILITY] Fixed fence/cage terminology in {key}")
+                logger.info("[FEASIBILITY] Fixed fence/cage terminology in %s", key)
     
     return audit_data
 
@@ -146,6 +260,33 @@ ACCESSIBILITY_SCORE_WEIGHTS = {
     }
 }
 
+# Cost ranges split into parallel sorted lists for a bisect lookup on the upper bound
+_COST_RANGES = sorted(ACCESSIBILITY_SCORE_WEIGHTS["cost"]["ranges"])
+_COST_LOWER_BOUNDS = [min_cost for min_cost, _, _ in _COST_RANGES]
+_COST_UPPER_BOUNDS = [max_cost for _, max_cost, _ in _COST_RANGES]
+_COST_POINTS = [points for _, _, points in _COST_RANGES]
+
+# Renovation keywords scored by calculate_accessibility_score, each group compiled to
+# one alternation. Plain substring matches, like the keyword lists they replace
+# ("grab bar" also matches "grab bars", "sign" also matches "signage")
+_MAJOR_STRUCTURAL_RE = re.compile("lift|elevator|platform|major structural|foundation")
+_SIMPLE_ADDITION_RE = re.compile("grab bar|signage|sign|handle|lever")
+_MODERATE_CHANGE_RE = re.compile("ramp|wider|doorway|threshold")
+
+# Caps for an inflated (> $50k) cost estimate, as (keywords, cap) rules checked in
+# order against the lowercased renovation suggestion; the first match wins
+_COST_CAP_RULES = (
+    # Simple additions should be under $500
+    (re.compile("grab bar|handle|signage|lever"), 500),
+    # Moderate changes should be under $5000
+    (re.compile("ramp|wider doorway|threshold"), 5000),
+    # Major changes like lifts can be $15-20k, cap at $25k
+    (re.compile("lift|elevator|platform"), 25000),
+)
+# For other cases, reduce by 30% and cap at $30k
+_COST_CAP_OTHER_FACTOR = 0.7
+_COST_CAP_OTHER = 30000
+
 
 # ============================================================================
 # VALIDATION HELPERS
@@ -163,31 +304,60 @@ def _validate_image_url(image_url: str) -> None:
     if not image_url or not isinstance(image_url, str):
         raise ValueError("Image URL must be a non-empty string")
     
+    if not _is_valid_image_url(image_url):
+        raise ValueError(f"Invalid URL format: {image_url}")
+
+
+@functools.lru_cache(maxsize=4096)
+def _is_valid_image_url(image_url: str) -> bool:
+    """Parses a URL once per distinct string; the audit and generation of a photo share the result."""
     try:
         parsed = urlparse(image_url)
-        if not parsed.scheme or not parsed.netloc:
-            raise ValueError(f"Invalid URL format: {image_url}")
-    except Exception as e:
-        raise ValueError(f"Invalid URL format: {image_url}") from e
+    except ValueError:
+        return False
+    return bool(parsed.scheme and parsed.netloc)
 
 
-def _validate_image_size(image_data: bytes) -> None:
+def _validate_image_size(size_bytes: int) -> None:
     """Validates that the image size is within acceptable limits.
     
     Args:
-        image_data: The image bytes to validate
+        size_bytes: The image size (declared or downloaded so far) in bytes
         
     Raises:
         ValueError: If the image is too large
     """
-    if len(image_data) > MAX_IMAGE_SIZE_BYTES:
-        size_mb = len(image_data) / (1024 * 1024)
+    if size_bytes > MAX_IMAGE_SIZE_BYTES:
+        size_mb = size_bytes / (1024 * 1024)
         raise ValueError(
             f"Image size ({size_mb:.2f} MB) exceeds maximum allowed size "
             f"({MAX_IMAGE_SIZE_MB} MB)"
         )
 
 
+# Fields every audit response must contain (in the order they are reported when missing)
+_REQUIRED_AUDIT_FIELDS = (
+    "barrier_detected",
+    "renovation_suggestion",
+    "cost_estimate",
+    "compliance_note",
+    "build_mask",
+    "build_prompt",
+    "mask_prompt",
+    "image_gen_prompt",
+)
+_REQUIRED_AUDIT_FIELD_SET = frozenset(_REQUIRED_AUDIT_FIELDS)
+
+# Optional fields defaulted to "" when the model leaves them out
+_OPTIONAL_AUDIT_FIELDS = ("clear_mask", "clear_prompt", "problem_description", "solution_description")
+
+# barrier_detected wording that means the room needs no renovation
+_BARRIER_NEG_PHRASES = ("no accessibility barriers", "no barriers", "already accessible")
+
+# Dollar amounts in a cost_estimate string (e.g. "$1,000 - $2,000")
+_COST_RE = re.compile(r'\$?([\d,]+)')
+
+
 def _validate_audit_response(audit_data: Dict[str, Any]) -> Dict[str, Any]:
     """Validates and ensures all required fields are present in audit response.
     
@@ -200,26 +370,15 @@ def _validate_audit_response(audit_data: Dict[str, Any]) -> Dict[str, Any]:
     Raises:
         ValueError: If required fields are missing
     """
-    required_fields = [
-        "barrier_detected",
-        "renovation_suggestion",
-        "cost_estimate",
-        "compliance_note",
-        "build_mask",
-        "build_prompt",
-        "mask_prompt",
-        "image_gen_prompt",
-    ]
-    
-    missing_fields = [field for field in required_fields if field not in audit_data]
-    if missing_fields:
+    if not _REQUIRED_AUDIT_FIELD_SET <= audit_data.keys():
+        missing_fields = [field for field in _REQUIRED_AUDIT_FIELDS if field not in audit_data]
         raise ValueError(
             f"Missing required fields in audit response: {', '.join(missing_fields)}"
         )
     
     # Check if no barriers were detected - if so, ensure all renovation fields are empty
     barrier_detected = audit_data.get("barrier_detected", "").lower()
-    if "no accessibility barriers" in barrier_detected or "no barriers" in barrier_detected or "already accessible" in barrier_detected:
+    if any(phrase in barrier_detected for phrase in _BARRIER_NEG_PHRASES):
         # Room doesn't need changes - set all renovation fields to empty
         audit_data["renovation_suggestion"] = ""
         audit_data["build_mask"] = ""
@@ -230,33 +389,28 @@ def _validate_audit_response(audit_data: Dict[str, Any]) -> Dict[str, Any]:
         audit_data["clear_prompt"] = ""
         audit_data["cost_estimate"] = "$0"
         audit_data["estimated_cost_usd"] = 0
-        print("[VALIDATION] No barriers detected - skipping renovation generation")
+        logger.info("[VALIDATION] No barriers detected - skipping renovation generation")
     
-    # Set defaults for optional two-pass fields if not present
-    audit_data.setdefault("clear_mask", "")
-    audit_data.setdefault("clear_prompt", "")
-    
-    # Set defaults for optional problem/solution description fields
-    audit_data.setdefault("problem_description", "")
-    audit_data.setdefault("solution_description", "")
+    # Set defaults for optional two-pass and problem/solution description fields if not present
+    for field in _OPTIONAL_AUDIT_FIELDS:
+        audit_data.setdefault(field, "")
     
     # Set a default estimated_cost_usd (int) for backward compatibility and internal logic
-    # Parse from cost_estimate string (e.g. "$1,000 - $2,000" -> 1500)
-    cost_str = audit_data.get("cost_estimate", "$0")
-    import re
-    matches = re.findall(r'\$?([\d,]+)', cost_str)
-    if matches:
-        costs = [float(m.replace(',', '')) for m in matches]
-        avg_cost = sum(costs) / len(costs)
-        audit_data["estimated_cost_usd"] = int(avg_cost)
-    else:
-        audit_data["estimated_cost_usd"] = 0
+    # Parse from cost_estimate string (e.g. "$1,000 - $2,000" -> 1500), unless it is
+    # already set (the no-barriers branch above sets it to 0)
+    if "estimated_cost_usd" not in audit_data:
+        cost_str = audit_data.get("cost_estimate", "$0")
+        matches = _COST_RE.findall(cost_str)
+        if matches:
+            costs = [float(m.replace(',', '')) for m in matches]
+            avg_cost = sum(costs) / len(costs)
+            audit_data["estimated_cost_usd"] = int(avg_cost)
+        else:
+            audit_data["estimated_cost_usd"] = 0
     
-    # Add alias fields for frontend compatibility
-    if "barrier_detected" in audit_data:
-        audit_data["barrier"] = audit_data["barrier_detected"]
-    if "compliance_note" in audit_data:
-        audit_data["compliance_notes"] = audit_data["compliance_note"]
+    # Add alias fields for frontend compatibility (both sources are required fields)
+    audit_data["barrier"] = audit_data["barrier_detected"]
+    audit_data["compliance_notes"] = audit_data["compliance_note"]
     
     return audit_data
 
@@ -265,8 +419,28 @@ def _validate_audit_response(audit_data: Dict[str, Any]) -> Dict[str, Any]:
 # CORE FUNCTIONS
 # ============================================================================
 
+def _image_dhash(img: Image.Image) -> int:
+    """Computes a 64-bit difference hash, stable across re-encoding and resizing of a photo."""
+    pixels = img.convert("L").resize((9, 8), Image.Resampling.LANCZOS).tobytes()
+    bits = 0
+    for row in range(0, 72, 9):
+        for col in range(row, row + 8):
+            bits = (bits << 1) | (pixels[col] > pixels[col + 1])
+    return bits
+
+def _sniff_mime(image_data: bytes) -> str:
+    """Returns the MIME type of an image from its magic bytes (JPEG if unrecognized)."""
+    header = image_data[:12]
+    if header.startswith(b"\x89PNG"):
+        return "image/png"
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return "image/webp"
+    if header.startswith(b"GIF8"):
+        return "image/gif"
+    return "image/jpeg"
+
 def get_image_bytes(image_url: str) -> bytes:
-    """Downloads an image and returns its raw bytes.
+    """Downloads an image and returns its raw bytes (cached by URL).
     
     Args:
         image_url: The URL of the image to download
@@ -281,14 +455,49 @@ def get_image_bytes(image_url: str) -> bytes:
     """
     _validate_image_url(image_url)
     
+    with image_bytes_cache_lock:
+        image_data = image_bytes_cache.get(image_url)
+        if image_data is not None:
+            return image_data
+        download = image_bytes_inflight.get(image_url)
+        if download is None:
+            download = image_bytes_inflight[image_url] = Future()
+            owner = True
+        else:
+            owner = False
+    if not owner:
+        # Another thread (e.g. a prefetch) is already downloading this photo
+        return download.result()
+    
     try:
-        response = requests.get(image_url, timeout=GEMINI_IMAGE_TIMEOUT)
-        response.raise_for_status()
-        
-        image_data = response.content
-        _validate_image_size(image_data)
-        
+        image_data = _download_image_bytes(image_url)
+        with image_bytes_cache_lock:
+            image_bytes_cache[image_url] = image_data
+        download.set_result(image_data)
         return image_data
+    except BaseException as e:
+        download.set_exception(e)
+        raise
+    finally:
+        with image_bytes_cache_lock:
+            image_bytes_inflight.pop(image_url, None)
+
+def _download_image_bytes(image_url: str) -> bytes:
+    """Fetches an image over the pooled session, enforcing MAX_IMAGE_SIZE_BYTES (no caching)."""
+    try:
+        with http_session.get(image_url, timeout=GEMINI_IMAGE_TIMEOUT, stream=True) as response:
+            response.raise_for_status()
+            
+            # Reject up front when the server declares an oversized body
+            content_length = response.headers.get("Content-Length", "")
+            if content_length.isdigit():
+                _validate_image_size(int(content_length))
+            
+            buffer = bytearray()
+            for chunk in response.iter_content(chunk_size=IMAGE_DOWNLOAD_CHUNK_BYTES):
+                buffer += chunk
+                _validate_image_size(len(buffer))
+            return bytes(buffer)
     except requests.Timeout:
         raise TimeoutError(f"Request timed out while downloading image from {image_url}")
     except requests.RequestException as e:
@@ -296,6 +505,29 @@ def get_image_bytes(image_url: str) -> bytes:
             f"Failed to download image from {image_url}: {str(e)}"
         ) from e
 
+def get_image_bytes_batch(image_urls: list[str]) -> list[bytes]:
+    """Downloads several images concurrently and returns their bytes in order.
+    
+    Each download goes through get_image_bytes (URL cache, pooled session), so a
+    batch of N photos costs roughly one round-trip instead of N.
+    
+    Raises:
+        The first error raised by get_image_bytes for any of the URLs
+    """
+    if len(image_urls) <= 1:
+        return [get_image_bytes(image_url) for image_url in image_urls]
+    return list(image_download_executor.map(get_image_bytes, image_urls))
+
+def prefetch_image_bytes(image_urls: list[str]) -> None:
+    """Starts downloading images in the background and returns immediately.
+    
+    The bytes land in image_bytes_cache, so a later audit or generation of the
+    same photo skips (or joins) the download. Failures are left for that later
+    get_image_bytes call to raise.
+    """
+    for image_url in image_urls:
+        image_download_executor.submit(get_image_bytes, image_url)
+
 def calculate_accessibility_score(audit_data: Dict[str, Any]) -> int:
     """Calculates an accessibility score (0-100) based on renovation impact.
     
@@ -319,10 +551,11 @@ def calculate_accessibility_score(audit_data: Dict[str, Any]) -> int:
     if not isinstance(cost, (int, float)):
         cost = 0
     
-    for min_cost, max_cost, points in weights["cost"]["ranges"]:
-        if min_cost <= cost <= max_cost:
-            score += points
-            break
+    # First range whose upper bound covers the cost; costs in the gaps between
+    # ranges (e.g. 5000.5) or below the first range score nothing
+    idx = bisect.bisect_left(_COST_UPPER_BOUNDS, cost)
+    if idx < len(_COST_POINTS) and cost >= _COST_LOWER_BOUNDS[idx]:
+        score += _COST_POINTS[idx]
     
     # Complexity Factor (0-30 points)
     clear_mask = audit_data.get("clear_mask", "")
@@ -332,8 +565,7 @@ def calculate_accessibility_score(audit_data: Dict[str, Any]) -> int:
     is_structural = bool(clear_mask and clear_mask.strip())
     
     # Check for major structural indicators
-    major_structural_keywords = ["lift", "elevator", "platform", "major structural", "foundation"]
-    is_major_structural = any(keyword in renovation_suggestion for keyword in major_structural_keywords)
+    is_major_structural = _MAJOR_STRUCTURAL_RE.search(renovation_suggestion) is not None
     
     if is_major_structural:
         score += weights["complexity"]["major_structural"]
@@ -342,16 +574,12 @@ def calculate_accessibility_score(audit_data: Dict[str, Any]) -> int:
     else:
         score += weights["complexity"]["non_structural"]
     
-    # Barrier Type Factor (0-20 points)
-    barrier = audit_data.get("barrier_detected", "").lower()
-    suggestion = renovation_suggestion.lower()
-    
+    # Barrier Type Factor (0-20 points), from the already-lowercased suggestion
     # Simple additions
-    simple_keywords = ["grab bar", "signage", "sign", "handle", "lever"]
-    if any(keyword in suggestion for keyword in simple_keywords):
+    if _SIMPLE_ADDITION_RE.search(renovation_suggestion):
         score += weights["barrier_type"]["simple_additions"]
     # Moderate changes
-    elif any(keyword in suggestion for keyword in ["ramp", "wider", "doorway", "threshold"]):
+    elif _MODERATE_CHANGE_RE.search(renovation_suggestion):
         score += weights["barrier_type"]["moderate_changes"]
     # Complex changes
     else:
@@ -403,113 +631,267 @@ def audit_room(image_url: str, wheelchair_accessible: bool = False) -> Dict[str,
         Exception: If Gemini API call fails
     """
     try:
-        image_data = get_image_bytes(image_url)
-        base64_image = base64.b64encode(image_data).decode('utf-8')
-        
-        # Determine MIME type from image data
-        img = Image.open(BytesIO(image_data))
-        mime_type = f"image/{img.format.lower()}" if img.format else "image/jpeg"
+        inline_image, cache_key, cached_audit = _prepare_audit_image(get_image_bytes(image_url), wheelchair_accessible)
+        if cached_audit is not None:
+            return cached_audit
 
-        # Use prompt from prompts.py with wheelchair_accessible flag
-        prompt = get_audit_prompt(wheelchair_accessible=wheelchair_accessible)
+        # Use prompts from prompts.py with wheelchair_accessible flag. The static audit
+        # prompt is sent as the (prebuilt) system instruction so Gemini can cache the shared prefix.
+        _, prompt = get_audit_prompt_messages(wheelchair_accessible=wheelchair_accessible)
 
         # Use new google.genai client for text analysis
         # Use same format as generate_renovation for consistency
         response = gemini_client.models.generate_content(
             model=GEMINI_TEXT_MODEL,
-            contents=[
-                prompt,
-                {
-                    "inline_data": {
-                        "mime_type": mime_type,
-                        "data": base64_image
-                    }
-                }
-            ],
-            config=genai_types.GenerateContentConfig(
-                response_modalities=["TEXT"],
-                response_mime_type="application/json"
-            )
+            contents=[prompt, inline_image],
+            config=AUDIT_CONFIGS[bool(wheelchair_accessible)]
         )
         
-        # Extract text response from GenerateContentResponse
-        # The response has a .text property and also candidates[0].content.parts[0].text
-        try:
-            # Try the .text property first (simplest)
-            response_text = response.text
-            
-            # Fallback to candidates structure if .text is empty
-            if not response_text and response.candidates and len(response.candidates) > 0:
-                candidate = response.candidates[0]
-                if candidate.content and candidate.content.parts:
-                    for part in candidate.content.parts:
-                        if hasattr(part, 'text') and part.text:
-                            response_text = part.text
-                            break
-            
-            if not response_text:
-                raise ValueError("No text found in Gemini response")
-            
-            # Parse JSON - handle both object and array formats
-            parsed_json = json.loads(response_text)
-            
-            # If the response is an array, extract the first element
-            if isinstance(parsed_json, list):
-                if len(parsed_json) > 0:
-                    audit_data = parsed_json[0]
-                else:
-                    raise ValueError("Empty array in JSON response")
-            else:
-                audit_data = parsed_json
-                
-        except json.JSONDecodeError as e:
-            print(f"[DEBUG] Failed to parse JSON. Response text: {response_text[:500] if 'response_text' in locals() else 'None'}")
-            raise ValueError(f"Failed to parse JSON response from Gemini: {str(e)}. Response: {response_text[:200] if 'response_text' in locals() else 'None'}") from e
-        except Exception as e:
-            print(f"[DEBUG] Error extracting response: {str(e)}")
-            raise
+        # Parse JSON - handle both object and array formats
+        parsed_json = _parse_audit_json(response)
         
-        # Validate response
-        if not audit_data:
-            raise ValueError("audit_data is None after parsing")
+        # If the response is an array, extract the first element
+        if isinstance(parsed_json, list):
+            if len(parsed_json) > 0:
+                audit_data = parsed_json[0]
+            else:
+                raise ValueError("Empty array in JSON response")
+        else:
+            audit_data = parsed_json
         
-        audit_data = _validate_audit_response(audit_data)
+        return _finalize_audit(audit_data, cache_key)
+    except ValueError:
+        raise  # Re-raise validation errors as-is
+    except Exception as e:
+        raise Exception(f"Audit failed: {str(e)}") from e
+
+def audit_rooms(image_urls: list[str], wheelchair_accessible: bool = False) -> list[Dict[str, Any]]:
+    """Audits several photos with a single Gemini request.
+    
+    The audit prompt (system instruction) is sent once per request instead of once
+    per photo, with up to AUDIT_BATCH_MAX_IMAGES photos in each request. Photos
+    already audited are served from the audit cache and left out of the request.
+    
+    Args:
+        image_urls: The URLs of the images to analyze
+        wheelchair_accessible: If True, apply wheelchair-accessible modifications;
+                               If False, apply general accessibility improvements
         
-        # Validate feasibility and block infeasible suggestions (elevators, lifts, etc.)
-        audit_data = validate_feasibility(audit_data)
+    Returns:
+        One audit dictionary per URL, in order (same fields as audit_room)
         
-        # Adjust cost if it seems unrealistic (cap at reasonable maximum for residential)
-        cost = audit_data.get("estimated_cost_usd", 0)
-        if cost > 50000:
-            # If cost exceeds $50k, it's likely inflated - reduce by 30-50% or cap
-            # This handles cases where AI overestimates for simple renovations
-            renovation_lower = audit_data.get("renovation_suggestion", "").lower()
-            new_cost = cost
-            if any(keyword in renovation_lower for keyword in ["grab bar", "handle", "signage", "lever"]):
-                # Simple additions should be under $500
-                new_cost = min(cost, 500)
-            elif any(keyword in renovation_lower for keyword in ["ramp", "wider doorway", "threshold"]):
-                # Moderate changes should be under $5000
-                new_cost = min(cost, 5000)
-            elif any(keyword in renovation_lower for keyword in ["lift", "elevator", "platform"]):
-                # Major changes like lifts can be $15-20k, cap at $25k
-                new_cost = min(cost, 25000)
+    Raises:
+        ValueError: If a URL is invalid or the response is malformed
+        requests.RequestException: If an image download fails
+        Exception: If Gemini API call fails
+    """
+    try:
+        results: list[Optional[Dict[str, Any]]] = [None] * len(image_urls)
+        pending = []  # (index, inline image, cache key) for photos Gemini must audit
+        for idx, image_data in enumerate(get_image_bytes_batch(image_urls)):
+            inline_image, cache_key, cached_audit = _prepare_audit_image(image_data, wheelchair_accessible)
+            if cached_audit is not None:
+                results[idx] = cached_audit
             else:
-                # For other cases, cap at $30k and reduce by 30%
-                new_cost = min(int(cost * 0.7), 30000)
-            
-            audit_data["estimated_cost_usd"] = new_cost
-            # Update cost_estimate string to match new capped cost
-            audit_data["cost_estimate"] = f"${int(new_cost * 0.8):,} - ${int(new_cost * 1.2):,}"
+                pending.append((idx, inline_image, cache_key))
+        
+        chunks = [
+            pending[start:start + AUDIT_BATCH_MAX_IMAGES]
+            for start in range(0, len(pending), AUDIT_BATCH_MAX_IMAGES)
+        ]
+        if len(chunks) == 1:
+            chunk_audits = [_audit_chunk(chunks[0], wheelchair_accessible)]
+        else:
+            # Independent requests; send them side by side instead of one after another
+            chunk_audits = list(audit_request_executor.map(
+                lambda chunk: _audit_chunk(chunk, wheelchair_accessible), chunks
+            ))
         
-        return audit_data
-    except json.JSONDecodeError as e:
-        raise ValueError(f"Failed to parse JSON response from Gemini: {str(e)}") from e
+        for chunk, audits in zip(chunks, chunk_audits):
+            for (idx, _, _), audit_data in zip(chunk, audits):
+                results[idx] = audit_data
+        
+        return results
     except ValueError:
         raise  # Re-raise validation errors as-is
     except Exception as e:
         raise Exception(f"Audit failed: {str(e)}") from e
 
+def _audit_chunk(chunk: list[tuple], wheelchair_accessible: bool) -> list[Dict[str, Any]]:
+    """Audits one audit_rooms request worth of (index, inline image, cache key) photos."""
+    _, prompt = get_audit_batch_prompt_messages(len(chunk), wheelchair_accessible=wheelchair_accessible)
+    contents = [prompt]
+    for number, (_, inline_image, _) in enumerate(chunk, 1):
+        contents.append(f"Photo {number}:")
+        contents.append(inline_image)
+    
+    response = gemini_client.models.generate_content(
+        model=GEMINI_TEXT_MODEL,
+        contents=contents,
+        config=AUDIT_BATCH_CONFIGS[bool(wheelchair_accessible)]
+    )
+    
+    parsed_json = _parse_audit_json(response)
+    if not isinstance(parsed_json, list) or len(parsed_json) != len(chunk):
+        raise ValueError(
+            f"Expected a JSON array of {len(chunk)} audits, got: {str(parsed_json)[:200]}"
+        )
+    
+    return [_finalize_audit(audit_data, cache_key) for (_, _, cache_key), audit_data in zip(chunk, parsed_json)]
+
+def warmup_audit_cache() -> None:
+    """Sends one throwaway request with the audit system instruction.
+    
+    Populates Gemini's implicit prompt cache for the shared audit prefix, so the
+    first real audit after startup does not pay the full prefill. The response
+    (capped at one token) is discarded.
+    """
+    gemini_client.models.generate_content(
+        model=GEMINI_TEXT_MODEL,
+        contents=["warmup"],
+        config=AUDIT_WARMUP_CONFIG
+    )
+
+def _prepare_audit_image(image_data: bytes, wheelchair_accessible: bool) -> tuple[Optional[genai_types.Part], tuple, Optional[Dict[str, Any]]]:
+    """Prepares a downloaded photo for auditing.
+    
+    Returns:
+        (inline image part for Gemini, audit cache key, cached audit or None);
+        the inline part is None when a cached audit is returned
+    """
+    # Same file already audited (possibly under another URL)?
+    digest_key = (hashlib.blake2b(image_data, digest_size=16).digest(), bool(wheelchair_accessible), AUDIT_PROMPT_VERSION)
+    with audit_result_cache_lock:
+        cached_audit = audit_digest_cache.get(digest_key)
+    if cached_audit is not None:
+        return None, (digest_key, None), dict(cached_audit)
+    
+    # Same or nearly the same photo, in a different encoding? Let the JPEG decoder
+    # scale down while decoding (DCT scaling); both the hash and the audit copy only
+    # need AUDIT_IMAGE_MAX_EDGE pixels, not the full-resolution original
+    img = Image.open(BytesIO(image_data))
+    # Opening only reads the header; a small photo in a format Gemini accepts
+    # doesn't need re-encoding, so its original bytes are uploaded as they are
+    passthrough = (
+        img.format in AUDIT_PASSTHROUGH_FORMATS
+        and len(image_data) <= AUDIT_PASSTHROUGH_MAX_BYTES
+        and max(img.size) <= AUDIT_IMAGE_MAX_EDGE
+    )
+    img.draft(None, (AUDIT_IMAGE_MAX_EDGE, AUDIT_IMAGE_MAX_EDGE))
+    hash_key = (_image_dhash(img), bool(wheelchair_accessible), AUDIT_PROMPT_VERSION)
+    with audit_result_cache_lock:
+        cached_audit = audit_result_cache.get(hash_key)
+        if cached_audit is None:
+            cached_audit = _find_similar_audit(hash_key)
+    cache_key = (digest_key, hash_key)
+    if cached_audit is not None:
+        return None, cache_key, dict(cached_audit)
+    
+    # Raw bytes go straight into the Part; the SDK base64-encodes them once on the wire
+    if passthrough:
+        inline_image = genai_types.Part.from_bytes(data=image_data, mime_type=Image.MIME[img.format])
+    else:
+        inline_image = genai_types.Part.from_bytes(data=prepare_image_for_audit(img), mime_type="image/webp")
+    return inline_image, cache_key, None
+
+def _find_similar_audit(hash_key: tuple) -> Optional[Dict[str, Any]]:
+    """Returns a cached audit whose photo hash is within AUDIT_HASH_MAX_DISTANCE bits.
+    
+    Caller must hold audit_result_cache_lock.
+    """
+    image_hash, flag, version = hash_key
+    for (cached_hash, cached_flag, cached_version) in audit_result_cache.keys():
+        if (cached_flag == flag and cached_version == version
+                and (cached_hash ^ image_hash).bit_count() <= AUDIT_HASH_MAX_DISTANCE):
+            return audit_result_cache[(cached_hash, cached_flag, cached_version)]
+    return None
+
+def prepare_image_for_audit(img: Image.Image) -> bytes:
+    """Downscales a photo to AUDIT_IMAGE_MAX_EDGE and re-encodes it as WebP.
+    
+    The audit only needs to recognize barriers, so a smaller image cuts upload
+    size and image tokens without affecting the result. Generation still uses
+    the original photo.
+    """
+    img = img.convert("RGB")
+    img.thumbnail((AUDIT_IMAGE_MAX_EDGE, AUDIT_IMAGE_MAX_EDGE), Image.Resampling.LANCZOS)
+    buffer = BytesIO()
+    img.save(buffer, format="WEBP", quality=AUDIT_IMAGE_WEBP_QUALITY)
+    return buffer.getvalue()
+
+def _response_parts(response: Any) -> list:
+    """Returns the parts of a Gemini response's first candidate (or response.parts)."""
+    if response.candidates:
+        content = response.candidates[0].content
+        if content and content.parts:
+            return content.parts
+    return getattr(response, 'parts', None) or []
+
+def _extract_response_text(response: Any) -> str:
+    """Returns a Gemini response's text, falling back to its first non-empty text part."""
+    # The response has a .text property and also candidates[0].content.parts[i].text
+    return getattr(response, 'text', '') or next(
+        (part.text for part in _response_parts(response) if getattr(part, 'text', None)), ''
+    )
+
+def _parse_audit_json(response: Any) -> Union[Dict[str, Any], list[Dict[str, Any]]]:
+    """Extracts, parses and validates the JSON text of an audit response."""
+    response_text = ""
+    try:
+        response_text = _extract_response_text(response)
+        if not response_text:
+            raise ValueError("No text found in Gemini response")
+        
+        parsed = parse_audit_response(response_text)
+        if isinstance(parsed, list):
+            return [audit.model_dump() for audit in parsed]
+        return parsed.model_dump()
+    except ValidationError as e:
+        logger.warning("Failed to parse audit JSON. Response text: %s", response_text[:500])
+        raise ValueError(f"Failed to parse JSON response from Gemini: {str(e)}. Response: {response_text[:200]}") from e
+    except Exception as e:
+        logger.warning("Error extracting audit response: %s", e)
+        raise
+
+def _cap_cost(cost: int, renovation_lower: str) -> int:
+    """Caps an inflated (> $50k) cost estimate based on the lowercased renovation suggestion."""
+    for keywords, cap in _COST_CAP_RULES:
+        if keywords.search(renovation_lower):
+            return min(cost, cap)
+    return min(int(cost * _COST_CAP_OTHER_FACTOR), _COST_CAP_OTHER)
+
+def _finalize_audit(audit_data: Dict[str, Any], cache_key: tuple) -> Dict[str, Any]:
+    """Validates a parsed audit, applies feasibility and cost rules, and caches it.
+    
+    cache_key is the (digest key, perceptual hash key) pair from _prepare_audit_image.
+    """
+    # Validate response
+    if not audit_data:
+        raise ValueError("audit_data is None after parsing")
+    
+    audit_data = _validate_audit_response(audit_data)
+    
+    # Validate feasibility and block infeasible suggestions (elevators, lifts, etc.)
+    audit_data = validate_feasibility(audit_data)
+    
+    # Adjust cost if it seems unrealistic (cap at reasonable maximum for residential)
+    cost = audit_data.get("estimated_cost_usd", 0)
+    if cost > 50000:
+        # If cost exceeds $50k, it's likely inflated - reduce by 30-50% or cap
+        # This handles cases where AI overestimates for simple renovations
+        new_cost = _cap_cost(cost, audit_data.get("renovation_suggestion", "").lower())
+        audit_data["estimated_cost_usd"] = new_cost
+        # Update cost_estimate string to match new capped cost
+        audit_data["cost_estimate"] = f"${int(new_cost * 0.8):,} - ${int(new_cost * 1.2):,}"
+    
+    digest_key, hash_key = cache_key
+    with audit_result_cache_lock:
+        audit_digest_cache[digest_key] = dict(audit_data)
+        if hash_key is not None:
+            audit_result_cache[hash_key] = dict(audit_data)
+    
+    return audit_data
+
 def generate_renovation(
     image_url: str,
     prompt: str,
@@ -549,26 +931,25 @@ def generate_renovation(
         raise ValueError("prompt and mask_prompt are required")
     
     try:
-        # Download and encode the original image
+        # Download the original image
         image_data = get_image_bytes(image_url)
-        base64_image = base64.b64encode(image_data).decode('utf-8')
         
-        # Determine MIME type from image data
-        img = Image.open(BytesIO(image_data))
-        mime_type = f"image/{img.format.lower()}" if img.format else "image/jpeg"
+        # Determine MIME type from the file's magic bytes (no PIL parse needed)
+        mime_type = _sniff_mime(image_data)
         
         # Build reasoning prompt for spatial analysis and AODA-compliant regeneration
+        # (the negative prompt is already inlined in it; Gemini has no separate parameter for one)
         if is_two_pass and clear_mask and clear_prompt and build_mask and build_prompt:
             # Structural renovation: needs removal then construction
-            reasoning_prompt = get_structural_renovation_prompt(
+            reasoning_prompt, _ = get_structural_renovation_prompt(
                 clear_mask, clear_prompt, build_mask, build_prompt, wheelchair_accessible=wheelchair_accessible
             )
         else:
             # Non-structural renovation: direct modification
-            reasoning_prompt = get_non_structural_renovation_prompt(mask_prompt, prompt, wheelchair_accessible=wheelchair_accessible)
+            reasoning_prompt, _ = get_non_structural_renovation_prompt(mask_prompt, prompt, wheelchair_accessible=wheelchair_accessible)
 
-        print(f"[Gemini Image] Reasoning prompt constructed for: {mask_prompt}")
-        print(f"[Gemini Image] Target modification: {prompt}")
+        logger.debug("[Gemini Image] Reasoning prompt constructed for: %s", mask_prompt)
+        logger.debug("[Gemini Image] Target modification: %s", prompt)
         
         # Call Gemini for image generation with Flash-optimized settings
         # We prioritize speed by removing any reasoning/thinking requirements
@@ -576,12 +957,7 @@ def generate_renovation(
             model=GEMINI_IMAGE_MODEL,
             contents=[
                 reasoning_prompt,
-                {
-                    "inline_data": {
-                        "mime_type": mime_type,
-                        "data": base64_image
-                    }
-                }
+                genai_types.Part.from_bytes(data=image_data, mime_type=mime_type)
             ],
             config=genai_types.GenerateContentConfig(
                 response_modalities=["TEXT", "IMAGE"],
@@ -591,58 +967,48 @@ def generate_renovation(
         
         # Extract the generated image from the response
         # Iterate through parts to find the actual image modality
-        print(f"[DEBUG] Response type: {type(response)}")
+        logger.debug("Response type: %s", type(response))
         
-        parts = []
-        if response.candidates and len(response.candidates) > 0:
-            candidate = response.candidates[0]
-            if candidate.content and candidate.content.parts:
-                parts = candidate.content.parts
-                print(f"[DEBUG] Found {len(parts)} parts in candidate.content.parts")
-        
-        # Fallback to response.parts if available
-        if not parts and hasattr(response, 'parts') and response.parts:
-            parts = response.parts
-            print(f"[DEBUG] Found {len(parts)} parts in response.parts")
-            
+        parts = _response_parts(response)
         if not parts:
-            print(f"[DEBUG] No parts found in response or candidate. Finish reason: {getattr(response.candidates[0], 'finish_reason', 'N/A') if response.candidates else 'N/A'}")
+            logger.warning(
+                "[Gemini Image] No parts found in response or candidate. Finish reason: %s",
+                getattr(response.candidates[0], 'finish_reason', 'N/A') if response.candidates else 'N/A'
+            )
             return None
+        logger.debug("Found %d parts in response", len(parts))
 
-        # Find all parts that could be images
-        image_bytes = None
+        # Return the first part that carries the image
         for i, part in enumerate(parts):
-            print(f"[DEBUG] Inspecting part {i}: type={type(part)}")
-            
             # Log any text/reasoning if present
-            if hasattr(part, 'text') and part.text:
-                print(f"[Gemini Image] Output text: {part.text[:200]}...")
+            text = getattr(part, 'text', None)
+            if text:
+                logger.debug("[Gemini Image] Output text: %s...", text[:200])
             
-            # Check for image data in different possible attributes
-            # 1. inline_data.data (Standard for generate_content with IMAGE modality)
-            if hasattr(part, 'inline_data') and part.inline_data:
-                if part.inline_data.data:
-                    current_data = part.inline_data.data
-                    print(f"[DEBUG] Part {i} has inline_data.data, size: {len(current_data)} bytes")
-                    # If it's a significant size, it's likely our image
-                    if len(current_data) > 10000:
-                        image_bytes = current_data
-                        break
+            # 1. inline_data.data (Standard for generate_content with IMAGE modality);
+            # only a significant size is likely our image
+            try:
+                image_bytes = part.inline_data.data
+            except AttributeError:  # no inline_data on this part
+                image_bytes = None
+            if image_bytes:
+                logger.debug("Part %d has inline_data.data, size: %d bytes", i, len(image_bytes))
+            if image_bytes and len(image_bytes) > GENERATED_IMAGE_MIN_BYTES:
+                logger.info("[Gemini Image] Successfully extracted image (%d bytes)", len(image_bytes))
+                return image_bytes
             
             # 2. image attribute (Some SDK versions/models)
-            if hasattr(part, 'image') and part.image:
-                if hasattr(part.image, 'data') and part.image.data:
-                    print(f"[DEBUG] Part {i} has image.data, size: {len(part.image.data)} bytes")
-                    image_bytes = part.image.data
-                    break
-        
-        if image_bytes:
-            print(f"[Gemini Image] Successfully extracted image ({len(image_bytes)} bytes)")
-            return image_bytes
+            try:
+                image_bytes = part.image.data
+            except AttributeError:
+                image_bytes = None
+            if image_bytes:
+                logger.info("[Gemini Image] Successfully extracted image (%d bytes)", len(image_bytes))
+                return image_bytes
         
-        print("[Gemini Image] No image part found in response parts")
+        logger.warning("[Gemini Image] No image part found in response parts")
         return None
         
     except Exception as e:
-        print(f"[Gemini Image] Generation failed: {str(e)}")
+        logger.error("[Gemini Image] Generation failed: %s", e)
         return None
\ No newline at end of file
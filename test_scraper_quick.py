@@ -1,8 +1,10 @@
 #!/usr/bin/env python3
 """Quick test of the scraper to debug the issue"""
 
+import os
 import sys
-sys.path.insert(0, '/Users/zishine/VSCODE/deltahacks/deltahacks26/backend')
+# The scraper lives in backend/ next to this script
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
 
 from scraper import scrape_realtor_ca_listing
 